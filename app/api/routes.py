@@ -1,13 +1,15 @@
+import asyncio
 import json
-import magic
-import uuid
 import os
-import aiohttp
-import asyncio
 import base64
-from app.services.prompt_generator import generate_prompt_gemini, generate_prompt_openai
-from app.services.sending_generation_request import (send_generation_request,
-                                                     check_generation_status)
+import re
+import time
+import secrets
+from app.services.llm_router import llm_router
+from app.services.prompt_stream import PromptExtractor
+from app.services.sending_generation_request import send_generation_request
+from app.services.status_cache import status_cache, TERMINAL_STATUSES
+from app.services.job_tracker import job_tracker, SSE_KEEPALIVE_INTERVAL
 from fastapi import HTTPException, APIRouter, Form, UploadFile, File, Request
 from app.models import (
     Style,
@@ -15,27 +17,69 @@ from app.models import (
     ImagineDevResponse,
     Prompt,
     MergedAudioResponse,
+    MergedAudioLinkResponse,
 )
 from loguru import logger
-from app.utils import append_to_json_file
-from dotenv import load_dotenv
 
-import shutil
 from starlette.background import BackgroundTask
 
-from fastapi.responses import FileResponse
-from pydub import AudioSegment
-from tempfile import TemporaryDirectory
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from app.services import file_io
 from app.services.transcription import transcribe_audio
+from app.services.audio_merge import merge_session_audio, probe_audio, AudioMergeError
+from app.services.session_normalizer import session_normalizer
+from app.services.session_store import session_store, ClipEntry, DuplicateClipError, DuplicateSourceError
+from app.services.uploads import ingest_upload, IngestedUpload
+from app.services.image_preprocessing import image_preprocessor
+from app.services.audio_fetcher import audio_fetcher
+from app.core.metrics import render_metrics
+from app.settings import get_settings
 
 
-load_dotenv(override=True)
 router = APIRouter()
 
 # --- Constants ---
 ALLOWED_MIME_TYPES = ["image/jpeg", "image/png", "image/webp", "image/gif"]
 ALLOWED_AUDIO_MIME_TYPES = ["audio/mpeg", "audio/wav", "audio/ogg", "audio/mp3", "audio/x-wav", "audio/aac"]
-TEMP_AUDIO_BASE_DIR = "temp_audio_sessions"
+MERGED_AUDIO_TOKEN_RE = re.compile(r"[A-Za-z0-9_-]+")
+
+settings = get_settings()
+
+def resolve_style(style: Style, custom_style: str | None) -> str:
+    if style == Style.OTHER and not custom_style:
+        raise HTTPException(status_code=400, detail="custom_style is required when style is 'other'")
+    return custom_style if style == Style.OTHER else style.value
+
+def stream_prompt_events(**kwargs) -> StreamingResponse:
+    """
+    Server-Sent Events stream of a prompt as the model writes it: `delta` events
+    with the newly generated text, then one `done` event with the full prompt,
+    or an `error` event.
+    """
+    async def event_stream():
+        extractor = PromptExtractor()
+        try:
+            async for chunk in llm_router.stream(**kwargs):
+                text = extractor.feed(chunk)
+                if text:
+                    yield f"event: delta\ndata: {json.dumps({'text': text})}\n\n"
+        except Exception as e:
+            logger.error(f"Error during streamed prompt generation: {e}")
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+            return
+        if not extractor.done:
+            logger.error("Streamed prompt completion did not contain a prompt.")
+            yield f"event: error\ndata: {json.dumps({'detail': 'The model response did not contain a prompt.'})}\n\n"
+            return
+        logger.info(f"Streamed prompt: {extractor.text}")
+        yield f"event: done\ndata: {Prompt(text=extractor.text).model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 # --- Image Generation Routes (Unchanged) ---
 @router.post("/ask_user/", response_model=Prompt, name="Generate Initial Prompt")
@@ -47,16 +91,14 @@ async def generate_initial_prompt(
     style: Style = Form(..., description="The style for the image."),
     other: str = Form(..., description="Other objects along with the main object."),
     custom_style: str = Form(None, description="Describe a custom style if 'other' is selected."),
+    bypass_cache: bool = Form(False, description="Skip the prompt cache and always call the model."),
 ):
-    final_style = style.value
-    if style == Style.OTHER and not custom_style:
-        raise HTTPException(status_code=400, detail="custom_style is required when style is 'other'")
-    elif style == Style.OTHER:
-        final_style = custom_style
+    final_style = resolve_style(style, custom_style)
     try:
-        prompt_data = generate_prompt_openai(
+        prompt_data = await llm_router.generate(
             place=place, time=time, object=object,
-            action=action, style=final_style, other=other
+            action=action, style=final_style, other=other,
+            use_cache=not bypass_cache
         )
         logger.info(f"Generated initial prompt: {prompt_data['prompt']}")
         return Prompt(text=prompt_data['prompt'])
@@ -73,25 +115,20 @@ async def generate_prompt_with_image(
     style: Style = Form(..., description="The style for the image."),
     other: str = Form(..., description="Other objects along with the main object."),
     custom_style: str = Form(None, description="Describe a custom style if 'other' is selected."),
+    bypass_cache: bool = Form(False, description="Skip the prompt cache and always call the model."),
     ref_img: UploadFile = File(..., description="A reference image to inspire the new prompt.")
 ):
-    image_bytes = await ref_img.read()
-    mime_type = magic.from_buffer(image_bytes, mime=True)
-    if mime_type not in ALLOWED_MIME_TYPES:
-        raise HTTPException(status_code=400, detail=f"Invalid file type. Please upload a valid image. Detected: {mime_type}")
+    upload = await ingest_upload(ref_img, ALLOWED_MIME_TYPES, settings.MAX_IMAGE_UPLOAD_BYTES, kind="image")
+    image = await image_preprocessor.prepare(upload)
 
-    final_style = style.value
-    if style == Style.OTHER and not custom_style:
-        raise HTTPException(status_code=400, detail="custom_style is required when style is 'other'")
-    elif style == Style.OTHER:
-        final_style = custom_style
+    final_style = resolve_style(style, custom_style)
 
     try:
-        prompt_data = generate_prompt_openai(
+        prompt_data = await llm_router.generate(
             place=place, time=time, object=object,
             action=action, style=final_style, other=other,
-            image_bytes=image_bytes,
-            mime_type=mime_type
+            image=image,
+            use_cache=not bypass_cache
         )
         logger.info(f"Generated prompt with image inspiration: {prompt_data['prompt']}")
         return Prompt(text=prompt_data['prompt'])
@@ -102,18 +139,17 @@ async def generate_prompt_with_image(
 @router.post("/update-prompt/", response_model=Prompt, name="Update Prompt with Image")
 async def update_prompt_with_image(
     previous_prompt: str = Form(..., description="The previously generated prompt from the /ask_user endpoint."),
+    bypass_cache: bool = Form(False, description="Skip the prompt cache and always call the model."),
     ref_img: UploadFile = File(..., description="A reference image to inspire the new prompt.")
 ):
-    image_bytes = await ref_img.read()
-    mime_type = magic.from_buffer(image_bytes, mime=True)
-    if mime_type not in ALLOWED_MIME_TYPES:
-        raise HTTPException(status_code=400, detail=f"Invalid file type. Please upload a valid image. Detected: {mime_type}")
+    upload = await ingest_upload(ref_img, ALLOWED_MIME_TYPES, settings.MAX_IMAGE_UPLOAD_BYTES, kind="image")
+    image = await image_preprocessor.prepare(upload)
 
     try:
-        prompt_data = generate_prompt_openai(
+        prompt_data = await llm_router.generate(
             previous_prompt=previous_prompt,
-            image_bytes=image_bytes,
-            mime_type=mime_type
+            image=image,
+            use_cache=not bypass_cache
         )
         logger.info(f"Updated prompt with image inspiration: {prompt_data['prompt']}")
         return Prompt(text=prompt_data['prompt'])
@@ -121,12 +157,68 @@ async def update_prompt_with_image(
         logger.error(f"Error during prompt update: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/ask_user/stream", name="Stream Initial Prompt")
+async def stream_initial_prompt(
+    place: str = Form(..., description="The imaginary or real place."),
+    time: str = Form(..., description="The time, era or both."),
+    object: str = Form(..., description="The object, person, or other thing."),
+    action: str = Form(..., description="What are they doing?"),
+    style: Style = Form(..., description="The style for the image."),
+    other: str = Form(..., description="Other objects along with the main object."),
+    custom_style: str = Form(None, description="Describe a custom style if 'other' is selected."),
+    bypass_cache: bool = Form(False, description="Skip the prompt cache and always call the model."),
+):
+    """Streaming variant of /ask_user/ over Server-Sent Events."""
+    return stream_prompt_events(
+        place=place, time=time, object=object,
+        action=action, style=resolve_style(style, custom_style), other=other,
+        use_cache=not bypass_cache
+    )
+
+@router.post("/ask_user_with_img/stream", name="Stream Prompt with Image")
+async def stream_prompt_with_image(
+    place: str = Form(..., description="The imaginary or real place."),
+    time: str = Form(..., description="The time, era or both."),
+    object: str = Form(..., description="The object, person, or other thing."),
+    action: str = Form(..., description="What are they doing?"),
+    style: Style = Form(..., description="The style for the image."),
+    other: str = Form(..., description="Other objects along with the main object."),
+    custom_style: str = Form(None, description="Describe a custom style if 'other' is selected."),
+    bypass_cache: bool = Form(False, description="Skip the prompt cache and always call the model."),
+    ref_img: UploadFile = File(..., description="A reference image to inspire the new prompt.")
+):
+    """Streaming variant of /ask_user_with_img/ over Server-Sent Events."""
+    upload = await ingest_upload(ref_img, ALLOWED_MIME_TYPES, settings.MAX_IMAGE_UPLOAD_BYTES, kind="image")
+    image = await image_preprocessor.prepare(upload)
+    return stream_prompt_events(
+        place=place, time=time, object=object,
+        action=action, style=resolve_style(style, custom_style), other=other,
+        image=image,
+        use_cache=not bypass_cache
+    )
+
+@router.post("/update-prompt/stream", name="Stream Updated Prompt with Image")
+async def stream_updated_prompt(
+    previous_prompt: str = Form(..., description="The previously generated prompt from the /ask_user endpoint."),
+    bypass_cache: bool = Form(False, description="Skip the prompt cache and always call the model."),
+    ref_img: UploadFile = File(..., description="A reference image to inspire the new prompt.")
+):
+    """Streaming variant of /update-prompt/ over Server-Sent Events."""
+    upload = await ingest_upload(ref_img, ALLOWED_MIME_TYPES, settings.MAX_IMAGE_UPLOAD_BYTES, kind="image")
+    image = await image_preprocessor.prepare(upload)
+    return stream_prompt_events(
+        previous_prompt=previous_prompt,
+        image=image,
+        use_cache=not bypass_cache
+    )
+
 @router.post("/generate-image/", response_model=GenerateImageResponse, name="Send Image Generation Request")
 async def generate_image(
     prompt: str = Form(..., description="The final prompt for image generation (can be from /ask_user or /update-prompt)."),
 ):
     try:
         response = await send_generation_request(prompt)
+        job_tracker.register(response['data']['id'])
         return GenerateImageResponse(
             message="Image generation started.",
             id=response['data']['id'],
@@ -141,74 +233,68 @@ async def generate_image(
 @router.get("/check-status/{image_id}", response_model=ImagineDevResponse, name="Check Status and Get Generated Images")
 async def check_status(image_id: str):
     try:
-        response = await check_generation_status(image_id)
-        status = response['data']['status']
-        if status in ['completed', 'failed']:
-            append_to_json_file(response['data'])
+        response = await status_cache.get(image_id)
         return ImagineDevResponse(**response['data'])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-async def download_audio_from_url(url: str) -> bytes:
-    """Asynchronously downloads audio content from a URL."""
+@router.get("/jobs/{image_id}/events", name="Stream Image Generation Status")
+async def stream_job_events(image_id: str):
+    """
+    Server-Sent Events stream for an image generation job, fed by the central poller.
+    Emits `progress` events while the job runs, then a single `completed`, `failed`
+    or `error` event carrying the final result, and closes.
+    """
+    async def event_stream():
+        async for event in job_tracker.events(image_id, keepalive=SSE_KEEPALIVE_INTERVAL):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            if event["event"] in TERMINAL_STATUSES:
+                data = ImagineDevResponse(**event["data"]).model_dump_json()
+            else:
+                data = json.dumps(event["data"])
+            yield f"event: {event['event']}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def filename_from_url(url: str, default: str) -> str:
+    return os.path.basename(url.split('?')[0]) or default
+
+async def save_audio_to_session(session_id: str, staged_path: str, original_filename: str,
+                                upload: IngestedUpload, source_url: str = None) -> ClipEntry:
+    """
+    Moves a validated audio file from its staging path into the session and
+    appends it to the session manifest with its MIME type, hash, duration and
+    sample rate. Rejects URLs and clip contents already in the session.
+    Returns the manifest entry.
+    """
     try:
-        if url.startswith("//"):
-            url = f"https:{url}"
-        url = url.strip()
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                content = await response.read()
-                logger.info(f"Successfully downloaded audio from {url}")
-                return content
-    except aiohttp.ClientError as e:
-        logger.error(f"Network or client error during download of {url}: {e}")
-        raise HTTPException(status_code=500, detail=f"Network or client error while downloading from URL.")
+        # ffprobe is a short subprocess: run it from a thread so uploads never wait behind merges in the pool.
+        info = await asyncio.to_thread(probe_audio, staged_path)
     except Exception as e:
-        logger.error(f"An unexpected error occurred while downloading {url}: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to download audio from URL.")
-
-def save_audio_to_session(session_id: str, file_content: bytes, original_filename: str, source_url: str = None):
-    """Saves audio content to a session directory after validation, prevents duplicate uploads."""
-    session_dir = os.path.join(TEMP_AUDIO_BASE_DIR, session_id)
-    os.makedirs(session_dir, exist_ok=True)
-    metadata_file = os.path.join(session_dir, "metadata.json")
-
-    metadata = {"urls": []}
-    if os.path.exists(metadata_file):
-        try:
-            with open(metadata_file, "r") as f:
-                metadata = json.load(f)
-        except Exception:
-            logger.warning(f"Could not read metadata.json for session {session_id}, resetting it.")
-            metadata = {"urls": []}
-
-    if source_url and source_url in metadata.get("urls", []):
-        raise HTTPException(status_code=400, detail="The provided URL has already been added for this session.")
-    mime_type = magic.from_buffer(file_content, mime=True)
-    if mime_type not in ALLOWED_AUDIO_MIME_TYPES:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid audio file type. Allowed types are: {', '.join(ALLOWED_AUDIO_MIME_TYPES)}. Detected: {mime_type}"
-        )
-    _, extension = os.path.splitext(original_filename)
-    if not extension:
-        extension = ".mp3"
-    unique_filename = f"{uuid.uuid4()}{extension}"
-    file_path = os.path.join(session_dir, unique_filename)
-
+        # The clip is still added; merging probes it again.
+        logger.warning(f"Could not probe audio file '{original_filename}': {e}")
+        info = None
     try:
-        with open(file_path, "wb") as buffer:
-            buffer.write(file_content)
-        logger.info(f"Audio file '{original_filename}' saved for session '{session_id}' at {file_path}")
-
-        if source_url:
-            metadata["urls"].append(source_url)
-            with open(metadata_file, "w") as f:
-                json.dump(metadata, f)
+        clip = await session_store.add_clip(
+            session_id, staged_path, original_filename, upload.mime_type, upload.sha256, source_url,
+            duration=info["duration"] if info else None, sample_rate=info["sample_rate"] if info else None,
+        )
+    except DuplicateClipError:
+        raise HTTPException(status_code=400, detail="This audio file has already been added to this session.")
+    except DuplicateSourceError:
+        raise HTTPException(status_code=400, detail="The provided URL has already been added for this session.")
     except Exception as e:
         logger.error(f"Error saving audio file for session '{session_id}': {e}")
         raise HTTPException(status_code=500, detail="Error saving audio file.")
+    logger.info(f"Audio file '{original_filename}' saved for session '{session_id}' as clip {clip.seq} at {clip.path}")
+    session_normalizer.schedule(session_id, clip.path)
+    return clip
 
 @router.post("/upload-audio-file-to-session/", name="Upload Audio File to Session")
 async def upload_audio_file_to_session(
@@ -218,8 +304,10 @@ async def upload_audio_file_to_session(
     """
     Uploads a single audio file from your computer and associates it with a session ID.
     """
-    file_content = await audio_file.read()
-    save_audio_to_session(session_id, file_content, audio_file.filename)
+    staged_path = await session_store.staging_path(session_id)
+    upload = await ingest_upload(audio_file, ALLOWED_AUDIO_MIME_TYPES, settings.MAX_AUDIO_UPLOAD_BYTES,
+                                 kind="audio", dest_path=staged_path)
+    await save_audio_to_session(session_id, staged_path, audio_file.filename, upload)
     return {"message": f"Audio file '{audio_file.filename}' uploaded successfully for session '{session_id}'."}
 
 @router.post("/add-audio-url-to-session/", name="Add Audio URL to Session")
@@ -231,11 +319,82 @@ async def add_audio_url_to_session(
     Downloads a single audio file from a URL and associates it with a session ID.
     Prevents adding the same URL twice in the same session.
     """
-    file_content = await download_audio_from_url(audio_url)
-    original_filename = os.path.basename(audio_url.split('?')[0]) or "audio.mp3"
-    save_audio_to_session(session_id, file_content, original_filename, source_url=audio_url)
+    if audio_url in await session_store.source_urls(session_id):
+        raise HTTPException(status_code=400, detail="The provided URL has already been added for this session.")
+    staged_path = await session_store.staging_path(session_id)
+    upload = await audio_fetcher.fetch_to_file(audio_url, staged_path, ALLOWED_AUDIO_MIME_TYPES)
+    await save_audio_to_session(session_id, staged_path, filename_from_url(audio_url, "audio.mp3"), upload,
+                                source_url=audio_url)
     return {"message": f"Audio from URL added successfully for session '{session_id}'."}
 
+@router.post("/add-audio-urls-to-session/", name="Add Audio URLs to Session")
+async def add_audio_urls_to_session(
+    session_id: str = Form(..., description="Unique identifier for the audio session."),
+    audio_urls: list[str] = Form(..., description="URLs of audio files to download and add, in playback order."),
+):
+    """
+    Downloads several audio files concurrently and adds them to a session in the given order.
+    URLs or clip contents already in the session are skipped; failed downloads are reported per URL.
+    """
+    existing_urls = set(await session_store.source_urls(session_id))
+    urls, skipped = [], []
+    for url in audio_urls:
+        if url in existing_urls or url in urls:
+            skipped.append(url)
+        else:
+            urls.append(url)
+
+    staged_paths = [await session_store.staging_path(session_id) for _ in urls]
+    results = await audio_fetcher.fetch_many(urls, staged_paths, ALLOWED_AUDIO_MIME_TYPES)
+
+    added, failed = [], []
+    for url, staged_path, result in zip(urls, staged_paths, results):
+        if isinstance(result, HTTPException):
+            failed.append({"url": url, "detail": result.detail})
+            continue
+        # Files are moved into the session one by one, in request order.
+        try:
+            await save_audio_to_session(session_id, staged_path, filename_from_url(url, "audio.mp3"), result,
+                                        source_url=url)
+        except HTTPException as e:
+            if e.status_code != 400:
+                raise
+            skipped.append(url)
+            continue
+        added.append(url)
+    return {
+        "message": f"Added {len(added)} of {len(audio_urls)} audio URLs to session '{session_id}'.",
+        "added": added,
+        "skipped": skipped,
+        "failed": failed,
+    }
+
+
+async def list_session_clips(session_id: str) -> list[ClipEntry]:
+    """Returns the session's manifest in upload order, or raises 404 if it has no clips."""
+    clips = await session_store.list_clips(session_id)
+    if not clips:
+        raise HTTPException(status_code=404, detail=f"No audio files found for session ID '{session_id}'.")
+    return clips
+
+async def merge_session_to_file(session_id: str, clips: list[ClipEntry]) -> tuple[str, str]:
+    """
+    Merges the session's clips in manifest order into one MP3 inside the
+    session's working directory, using the clips normalized in the background
+    where ready. Returns (merged_file_path, merged_filename).
+    """
+    # Every clip's content type was checked when it was added, whatever its file extension.
+    audio_files = [clip.path for clip in clips]
+
+    merged_filename_final = f"merged_audio_{session_id}.mp3"
+    merged_file_path = os.path.join(session_store.working_dir(session_id), merged_filename_final)
+    await session_normalizer.wait(session_id)
+    merge_inputs, prenormalized = await session_normalizer.merge_inputs(audio_files)
+    try:
+        await merge_session_audio(merge_inputs, merged_file_path, prenormalized)
+    except AudioMergeError:
+        raise HTTPException(status_code=400, detail=f"No audio data could be processed for session '{session_id}'.")
+    return merged_file_path, merged_filename_final
 
 @router.post("/merge-audio-by-session/", name="Merge Audio by Session and Return File")
 async def merge_audio_by_session_file(
@@ -245,38 +404,19 @@ async def merge_audio_by_session_file(
     Finds all audio files for a given session ID, merges them sequentially,
     and returns the merged file. All session files are removed after the response is sent.
     """
-    session_dir = os.path.join(TEMP_AUDIO_BASE_DIR, session_id)
-    if not os.path.exists(session_dir) or not os.listdir(session_dir):
-        raise HTTPException(status_code=404, detail=f"No audio files found for session ID '{session_id}'.")
+    clips = await list_session_clips(session_id)
     try:
-        supported_extensions = tuple(f".{ext.split('/')[-1].lower()}" for ext in ALLOWED_AUDIO_MIME_TYPES if '/' in ext)
-        audio_files_in_dir = [f for f in os.listdir(session_dir) if f.lower().endswith(supported_extensions)]
-
-        if not audio_files_in_dir:
-            raise HTTPException(status_code=404, detail=f"No supported audio files found for session ID '{session_id}'.")
-
-        audio_files = sorted([os.path.join(session_dir, f) for f in audio_files_in_dir], key=os.path.getctime)
-        combined_audio = AudioSegment.empty()
-        for file_path in audio_files:
-            try:
-                audio = AudioSegment.from_file(file_path)
-                combined_audio += audio
-            except Exception as e:
-                logger.warning(f"Could not load audio file {file_path} for session {session_id}: {e}. Skipping.")
+        merged_file_path, merged_filename_final = await merge_session_to_file(session_id, clips)
 
-        if combined_audio.duration_seconds == 0:
-             raise HTTPException(status_code=400, detail=f"No audio data could be processed for session '{session_id}'.")
-
-        merged_filename_final = f"merged_audio_{session_id}.mp3"
-        merged_file_path = os.path.join(session_dir, merged_filename_final)
-        combined_audio.export(merged_file_path, format="mp3")
-
-        task = BackgroundTask(shutil.rmtree, session_dir)
+        task = BackgroundTask(session_store.delete, session_id)
         return FileResponse(merged_file_path, media_type="audio/mpeg", filename=merged_filename_final, background=task)
     except Exception as e:
         logger.error(f"Error merging audio for session '{session_id}': {e}")
-        if os.path.exists(session_dir):
-            shutil.rmtree(session_dir)
+        if isinstance(e, HTTPException) and e.status_code == 503:
+            raise
+        await session_store.delete(session_id)
+        if isinstance(e, HTTPException):
+            raise
         raise HTTPException(status_code=500, detail=f"Error merging audio files: {e}")
 
 @router.post("/transcribe-audio-by-url/", name="Transcribe Audio by URL")
@@ -287,18 +427,9 @@ async def transcribe_audio_by_url(
     Downloads an audio file from a URL, transcribes it, and returns the transcription.
     """
     try:
-        file_content = await download_audio_from_url(audio_url)
-        mime_type = magic.from_buffer(file_content, mime=True)
-        if mime_type not in ALLOWED_AUDIO_MIME_TYPES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid audio file type from URL. Allowed: {', '.join(ALLOWED_AUDIO_MIME_TYPES)}. Detected: {mime_type}"
-            )
-        with TemporaryDirectory() as temp_dir:
-            original_filename = os.path.basename(audio_url.split('?')[0]) or "audio.tmp"
-            temp_file_path = os.path.join(temp_dir, original_filename)
-            with open(temp_file_path, "wb") as temp_file:
-                temp_file.write(file_content)
+        async with file_io.temporary_directory() as temp_dir:
+            temp_file_path = os.path.join(temp_dir, filename_from_url(audio_url, "audio.tmp"))
+            await audio_fetcher.fetch_to_file(audio_url, temp_file_path, ALLOWED_AUDIO_MIME_TYPES)
             logger.info(f"Transcribing audio from URL: {audio_url}")
             transcription_text = await transcribe_audio(temp_file_path)
             logger.info("Successfully transcribed audio from URL.")
@@ -318,18 +449,10 @@ async def transcribe_audio_by_upload(
     """
     Transcribes a single uploaded audio file and returns the transcription.
     """
-    file_content = await audio_file.read()
-    mime_type = magic.from_buffer(file_content, mime=True)
-    if mime_type not in ALLOWED_AUDIO_MIME_TYPES:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid audio file type. Allowed types are: {', '.join(ALLOWED_AUDIO_MIME_TYPES)}. Detected: {mime_type}"
-        )
-
-    with TemporaryDirectory() as temp_dir:
-        temp_file_path = os.path.join(temp_dir, audio_file.filename)
-        with open(temp_file_path, "wb") as temp_file:
-            temp_file.write(file_content)
+    async with file_io.temporary_directory() as temp_dir:
+        temp_file_path = os.path.join(temp_dir, os.path.basename(audio_file.filename or "") or "audio.tmp")
+        await ingest_upload(audio_file, ALLOWED_AUDIO_MIME_TYPES, settings.MAX_AUDIO_UPLOAD_BYTES,
+                            kind="audio", dest_path=temp_file_path)
         transcription_text = await transcribe_audio(temp_file_path)
         return {"transcription": transcription_text}
 
@@ -342,55 +465,104 @@ async def merge_transcribe_audio_by_session_base64(
     """
     Finds all audio files for a given session ID, merges them sequentially,
     transcribes the result, and returns the merged audio file as a Base64 encoded string
-    along with the transcription. The session directory is deleted after processing.
+    along with the transcription. The session is deleted after processing.
     """
-    session_dir = os.path.join(TEMP_AUDIO_BASE_DIR, session_id)
-    if not os.path.exists(session_dir) or not any(f for f in os.listdir(session_dir) if not f.endswith('.json')):
-        raise HTTPException(status_code=404, detail=f"No audio files found for session ID '{session_id}'.")
+    clips = await list_session_clips(session_id)
 
+    keep_session = False
     try:
-        supported_extensions = tuple(f".{ext.split('/')[-1].lower()}" for ext in ALLOWED_AUDIO_MIME_TYPES if '/' in ext)
-        audio_files_in_dir = [f for f in os.listdir(session_dir) if f.lower().endswith(supported_extensions)]
+        merged_file_path, merged_filename_final = await merge_session_to_file(session_id, clips)
 
-        if not audio_files_in_dir:
-            raise HTTPException(status_code=404, detail=f"No supported audio files found for session ID '{session_id}'.")
+        transcription_text = await transcribe_audio(merged_file_path)
 
-        audio_files = sorted([os.path.join(session_dir, f) for f in audio_files_in_dir], key=os.path.getctime)
-        combined_audio = AudioSegment.empty()
-        for file_path in audio_files:
-            try:
-                audio = AudioSegment.from_file(file_path)
-                combined_audio += audio
-            except Exception as e:
-                logger.warning(f"Could not load audio file {file_path} for session {session_id}: {e}. Skipping.")
+        audio_bytes = await file_io.read_bytes(merged_file_path)
+        audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
 
-        if combined_audio.duration_seconds == 0:
-             raise HTTPException(status_code=400, detail=f"No audio data could be processed for session '{session_id}'.")
+        return MergedAudioResponse(
+            message="Audio merged and transcribed successfully.",
+            session_id=session_id,
+            merged_audio_filename=merged_filename_final,
+            transcription=transcription_text,
+            audio_data_base64=audio_base64
+        )
+    except Exception as e:
+        logger.error(f"Error processing audio for session '{session_id}': {e}")
+        if isinstance(e, HTTPException):
+            # Keep the clips when the audio pool is saturated so the client can retry.
+            keep_session = e.status_code == 503
+            raise
+        raise HTTPException(status_code=500, detail=f"Error processing audio files: {e}")
+    finally:
+        if not keep_session:
+            await session_store.delete(session_id)
 
-        merged_filename_final = f"merged_audio_{session_id}.mp3"
-        merged_file_path = os.path.join(session_dir, merged_filename_final)
-        combined_audio.export(merged_file_path, format="mp3")
 
-        transcription_text = await transcribe_audio(merged_file_path)
+@router.post("/merge-audio-and-transcription/",
+             response_model=MergedAudioLinkResponse, name="Merge and Transcribe Audio by Session (Download Link)")
+async def merge_transcribe_audio_by_session_link(
+    request: Request,
+    session_id: str = Form(..., description="Unique identifier for the audio session.")
+):
+    """
+    Finds all audio files for a given session ID, merges them sequentially and
+    transcribes the result. Returns the transcription with a short-lived link to
+    download the merged file, instead of embedding it as Base64.
+    The session is deleted after processing.
+    """
+    clips = await list_session_clips(session_id)
 
-        with open(merged_file_path, "rb") as audio_file:
-            audio_bytes = audio_file.read()
+    keep_session = False
+    try:
+        merged_file_path, merged_filename_final = await merge_session_to_file(session_id, clips)
 
-        audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
+        transcription_text = await transcribe_audio(merged_file_path)
 
-        return MergedAudioResponse(
+        token = secrets.token_urlsafe(24)
+        download_path = os.path.join(settings.MERGED_AUDIO_DIR, f"{token}.mp3")
+        await file_io.makedirs(settings.MERGED_AUDIO_DIR)
+        await file_io.move(merged_file_path, download_path)
+        # The link's lifetime is measured from the file's mtime, which the move keeps
+        # at the end of the merge; start it now, when the link is handed out.
+        await file_io.touch(download_path)
+
+        return MergedAudioLinkResponse(
             message="Audio merged and transcribed successfully.",
             session_id=session_id,
             merged_audio_filename=merged_filename_final,
             transcription=transcription_text,
-            audio_data_base64=audio_base64
+            download_url=str(request.url_for("Download Merged Audio", token=token)),
+            expires_in_seconds=settings.MERGED_AUDIO_LINK_TTL,
         )
     except Exception as e:
         logger.error(f"Error processing audio for session '{session_id}': {e}")
         if isinstance(e, HTTPException):
+            # Keep the clips when the audio pool is saturated so the client can retry.
+            keep_session = e.status_code == 503
             raise
         raise HTTPException(status_code=500, detail=f"Error processing audio files: {e}")
     finally:
-        if os.path.exists(session_dir):
-            shutil.rmtree(session_dir)
-            logger.info(f"Cleaned up session directory: {session_dir}")
\ No newline at end of file
+        if not keep_session:
+            await session_store.delete(session_id)
+
+
+@router.get("/merged-audio/{token}", name="Download Merged Audio")
+async def download_merged_audio(token: str):
+    """
+    Serves a merged audio file created by /merge-audio-and-transcription/ until its link expires.
+    Supports HTTP Range requests, so players can seek and downloads can resume.
+    """
+    file_path = os.path.join(settings.MERGED_AUDIO_DIR, f"{token}.mp3")
+    stat = await file_io.stat(file_path) if MERGED_AUDIO_TOKEN_RE.fullmatch(token) else None
+    if stat is None:
+        raise HTTPException(status_code=404, detail="Merged audio not found or expired.")
+    if time.time() - stat.st_mtime > settings.MERGED_AUDIO_LINK_TTL:
+        await file_io.remove(file_path)
+        raise HTTPException(status_code=404, detail="Merged audio not found or expired.")
+    return FileResponse(file_path, media_type="audio/mpeg", filename="merged_audio.mp3")
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint: request, upstream and stage latencies, cache and queue stats."""
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
@@ -0,0 +1,70 @@
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+
+from app.settings import get_settings
+
+
+class ClientRegistry:
+    """
+    Per-process registry of the API clients used by the services.
+
+    Clients are created on first use, or by `start()` in the app lifespan, so
+    each gunicorn worker builds its own connection pools after it has forked
+    and importing the app stays cheap. `close()` releases them on shutdown.
+    """
+
+    def __init__(self):
+        self._factories: dict[str, tuple[Callable[[], Any], Callable[[Any], Awaitable[None]]]] = {}
+        self._clients: dict[str, Any] = {}
+
+    def register(self, name: str, factory: Callable[[], Any], close: Callable[[Any], Awaitable[None]]) -> None:
+        self._factories[name] = (factory, close)
+
+    def get(self, name: str) -> Any:
+        client = self._clients.get(name)
+        if client is None:
+            factory, _ = self._factories[name]
+            client = self._clients[name] = factory()
+        return client
+
+    async def start(self) -> None:
+        for name in self._factories:
+            self.get(name)
+
+    async def close(self) -> None:
+        clients, self._clients = self._clients, {}
+        for name, client in reversed(clients.items()):
+            _, close = self._factories[name]
+            try:
+                await close(client)
+            except Exception as e:
+                logger.warning(f"Could not close the {name} client: {e}")
+
+
+def create_openai_client():
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(api_key=get_settings().OPENAI_API_KEY)
+
+
+def create_gemini_client():
+    from google import genai
+
+    return genai.Client(api_key=get_settings().GEMINI_API_KEY)
+
+
+async def close_openai_client(client) -> None:
+    await client.close()
+
+
+async def close_gemini_client(client) -> None:
+    # google-genai has no close() yet; release the SDK's own connection pools.
+    api_client = client._api_client
+    await api_client._async_httpx_client.aclose()
+    api_client._httpx_client.close()
+
+
+clients = ClientRegistry()
+clients.register("openai", create_openai_client, close_openai_client)
+clients.register("gemini", create_gemini_client, close_gemini_client)
@@ -3,13 +3,35 @@ from loguru import logger
 from contextlib import asynccontextmanager
 import os
 
+from app.core.clients import clients
+from app.services.job_tracker import job_tracker
+from app.services.results_store import results_store, LEGACY_RESULTS_PATH
+from app.core.logging import configure_logging, flush_logging
+from app.core.process_pool import audio_pool
+from app.services.audio_fetcher import audio_fetcher
+from app.services.session_store import session_store
+from app.services.session_reaper import session_reaper
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Lifespan context for the FastAPI app to manage startup and shutdown tasks.
     """
-    logger.add("logs.log", rotation="10 MB", level="INFO")
+    configure_logging()
+    await results_store.load(legacy_path=LEGACY_RESULTS_PATH)
+    await clients.start()
+    await job_tracker.start()
+    audio_pool.start()
+    await audio_fetcher.start()
+    await session_reaper.start()
     
     yield
 
     logger.info("Shutting down FastAPI app...")
+    await job_tracker.stop()
+    await session_reaper.stop()
+    await clients.close()
+    await audio_fetcher.close()
+    await session_store.close()
+    audio_pool.shutdown()
+    await flush_logging()
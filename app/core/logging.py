@@ -0,0 +1,79 @@
+import sys
+import threading
+from collections import defaultdict
+from typing import Mapping
+
+from loguru import logger
+
+from app.settings import APISettings, get_settings
+
+REDACTED = "***"
+SENSITIVE_HEADERS = frozenset({"authorization", "proxy-authorization", "cookie", "set-cookie", "x-api-key"})
+
+_WARNING = logger.level("WARNING").no
+_configured = False
+
+
+def redact_headers(headers: Mapping[str, str]) -> dict[str, str]:
+    """Returns a copy of `headers` that is safe to log, with credentials masked."""
+    return {name: REDACTED if name.lower() in SENSITIVE_HEADERS else value for name, value in headers.items()}
+
+
+def sampled(key: str):
+    """
+    Logger for a high-frequency line, e.g. one per status poll. Below WARNING,
+    only the first of every LOG_SAMPLE_EVERY records with the same `key` is kept.
+    """
+    return logger.bind(sample=key)
+
+
+class Sampler:
+    """loguru filter keeping 1 in `every` records bound with `sample=<key>`, per key."""
+
+    def __init__(self, every: int):
+        self.every = max(every, 1)
+        self._counts: defaultdict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def __call__(self, record) -> bool:
+        key = record["extra"].get("sample")
+        if key is None or self.every == 1 or record["level"].no >= _WARNING:
+            return True
+        with self._lock:
+            count = self._counts[key]
+            self._counts[key] = count + 1
+        return count % self.every == 0
+
+
+def configure_logging(settings: APISettings | None = None, force: bool = False) -> None:
+    """
+    Replaces loguru's default handler with the app's sinks: the console and,
+    if LOG_FILE is set, a rotated file. Records are handed to a background
+    thread (LOG_ENQUEUE), so request handlers never wait on the disk, and are
+    written as JSON lines when LOG_JSON is set. Runs once per process unless `force`.
+    """
+    global _configured
+    if _configured and not force:
+        return
+    settings = settings or get_settings()
+
+    logger.remove()
+    common = dict(
+        level=settings.LOG_LEVEL,
+        enqueue=settings.LOG_ENQUEUE,
+        serialize=settings.LOG_JSON,
+        # Tracebacks without variable values: they are cheaper to format and
+        # cannot leak request data such as API keys.
+        backtrace=False,
+        diagnose=False,
+    )
+    logger.add(sys.stderr, filter=Sampler(settings.LOG_SAMPLE_EVERY), **common)
+    if settings.LOG_FILE:
+        logger.add(settings.LOG_FILE, rotation=settings.LOG_ROTATION, retention=settings.LOG_RETENTION,
+                   filter=Sampler(settings.LOG_SAMPLE_EVERY), **common)
+    _configured = True
+
+
+async def flush_logging() -> None:
+    """Waits until the enqueued records have been written. Called on shutdown."""
+    await logger.complete()
@@ -0,0 +1,163 @@
+import functools
+import inspect
+import os
+import time
+from typing import Callable
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# Upstream calls and audio stages range from milliseconds (status polls, MIME
+# sniffing) to minutes (long merges and transcriptions).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to serve an HTTP request, per route.",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.", multiprocess_mode="livesum",
+)
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_duration_seconds", "Latency of calls to external services, per provider.",
+    ["provider", "operation", "outcome"], buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "upstream_requests_in_flight", "Calls to external services currently in flight.",
+    ["provider"], multiprocess_mode="livesum",
+)
+STAGE_LATENCY = Histogram(
+    "stage_duration_seconds", "Time spent in CPU-bound processing stages (audio, images).",
+    ["stage", "outcome"], buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Cache lookups by cache and result.", ["cache", "result"],
+)
+
+
+class timed:
+    """
+    Records the duration of a block or function in `histogram`, with an
+    `outcome` label of "ok" or "error", and counts it in the `in_flight` gauge
+    (already labelled, if it has labels) while it runs.
+
+        with timed(STAGE_LATENCY, stage="merge_audio_files"):
+            ...
+
+        async with openai_semaphore, timed(UPSTREAM_LATENCY, provider="openai", operation="chat"):
+            ...
+
+        @timed(STAGE_LATENCY, stage="transcription")
+        async def transcribe(...): ...
+    """
+
+    def __init__(self, histogram: Histogram, in_flight: Gauge | None = None, **labels: str):
+        self.histogram = histogram
+        self.in_flight = in_flight
+        self.labels = labels
+        self._started = 0.0
+
+    def __enter__(self) -> "timed":
+        if self.in_flight is not None:
+            self.in_flight.inc()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self._started
+        outcome = "ok" if exc_type is None else "error"
+        self.histogram.labels(outcome=outcome, **self.labels).observe(elapsed)
+        if self.in_flight is not None:
+            self.in_flight.dec()
+
+    async def __aenter__(self) -> "timed":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+    def __call__(self, fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with timed(self.histogram, self.in_flight, **self.labels):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(self.histogram, self.in_flight, **self.labels):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def upstream(provider: str, operation: str) -> timed:
+    """Times a call to an external service, e.g. `with upstream("openai", "chat"):`."""
+    return timed(UPSTREAM_LATENCY, UPSTREAM_IN_FLIGHT.labels(provider=provider),
+                 provider=provider, operation=operation)
+
+
+def count_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+class ServiceStatsCollector:
+    """
+    Exposes the `stats()` of the app's services (cache hit ratios, queue sizes,
+    tracked jobs...) as gauges, read at scrape time. Numeric values become
+    `app_<service>_<key>`; nested dicts of numbers get a label with the outer key.
+    """
+
+    def __init__(self):
+        self._sources: dict[str, Callable[[], dict]] = {}
+
+    def register(self, name: str, stats: Callable[[], dict]) -> None:
+        self._sources[name] = stats
+
+    def collect(self):
+        for service, stats in self._sources.items():
+            for key, value in stats().items():
+                name = f"app_{service}_{key}"
+                if isinstance(value, bool | int | float):
+                    yield GaugeMetricFamily(name, f"{service} {key}", value=float(value))
+                elif isinstance(value, dict) and all(isinstance(v, dict) for v in value.values()):
+                    yield from self._nested(name, key, value)
+
+    @staticmethod
+    def _nested(prefix: str, label: str, values: dict[str, dict]):
+        families: dict[str, GaugeMetricFamily] = {}
+        for item, fields in values.items():
+            for field, value in fields.items():
+                if value is None or not isinstance(value, bool | int | float):
+                    continue
+                family = families.setdefault(field, GaugeMetricFamily(
+                    f"{prefix}_{field}", f"{prefix} {field}", labels=[label.rstrip("s")]))
+                family.add_metric([item], float(value))
+        yield from families.values()
+
+
+service_stats = ServiceStatsCollector()
+REGISTRY.register(service_stats)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Renders all metrics in the Prometheus text format. Under gunicorn, set
+    PROMETHEUS_MULTIPROC_DIR so the histograms are aggregated across workers;
+    service stats are then those of the worker serving the scrape.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(service_stats)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,46 @@
+import time
+from fastapi import FastAPI
+
+from app.core.metrics import REQUEST_LATENCY, REQUESTS_IN_FLIGHT
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording every HTTP request in REQUEST_LATENCY, labelled
+    with the matched route template (not the raw path, which would explode the
+    label cardinality with ids) and the response status.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                method=scope["method"],
+                route=route.path if route is not None else "unmatched",
+                status=str(status),
+            ).observe(time.perf_counter() - started)
+
+
+# function for recording request metrics on web server
+def add_metrics_middleware(app: FastAPI):
+    app.add_middleware(MetricsMiddleware)
@@ -0,0 +1,92 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+from fastapi import HTTPException
+from loguru import logger
+
+from app.core.metrics import STAGE_LATENCY, service_stats, timed
+from app.settings import get_settings
+
+
+class ProcessPool:
+    """
+    Async facade over a ProcessPoolExecutor for CPU-bound work (audio decode,
+    merge, export), so it never runs on the event loop.
+
+    At most `max_pending` calls may be queued or running; beyond that callers
+    get a 503 immediately instead of piling up behind a long merge. If a worker
+    dies (OOM kill, segfault in ffmpeg bindings) the executor is replaced, and
+    the calls it took down get a 503 instead of breaking every later call.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+
+    def start(self) -> None:
+        if self._executor is None:
+            # Spawned workers do not inherit the parent's event loop, threads or sockets.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"Started process pool with {self.max_workers} workers.")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _replace_broken(self, executor: ProcessPoolExecutor) -> None:
+        # Several in-flight calls see the same broken executor; only the first replaces it.
+        if self._executor is not executor:
+            return
+        logger.error("A process pool worker died; restarting the pool.")
+        executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self.start()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def stats(self) -> dict:
+        return {"pending": self._pending, "max_pending": self.max_pending, "workers": self.max_workers}
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Runs `fn(*args)` in a worker process. `fn` and its arguments must be picklable."""
+        if self._pending >= self.max_pending:
+            logger.warning(f"Process pool saturated ({self._pending} pending), rejecting {fn.__name__}.")
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy processing audio. Please retry shortly.",
+                headers={"Retry-After": "5"},
+            )
+        self.start()
+        executor = self._executor
+        self._pending += 1
+        try:
+            with timed(STAGE_LATENCY, stage=fn.__name__):
+                return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            self._replace_broken(executor)
+            # Not retried: the call that killed the worker may well do it again.
+            raise HTTPException(
+                status_code=503,
+                detail="Audio processing was interrupted. Please retry.",
+                headers={"Retry-After": "5"},
+            )
+        finally:
+            self._pending -= 1
+
+
+_settings = get_settings()
+audio_pool = ProcessPool(
+    max_workers=_settings.AUDIO_POOL_WORKERS,
+    max_pending=_settings.AUDIO_POOL_MAX_PENDING,
+)
+service_stats.register("audio_pool", audio_pool.stats)
@@ -3,15 +3,18 @@ from app.api.router import api_router
 
 from app.core.event_handlers import lifespan
 from app.core.cors_middleware import add_cors_middleware
-from app.settings import APISettings
+from app.core.metrics_middleware import add_metrics_middleware
+from app.settings import get_settings
 
 
 def get_app() -> FastAPI:
-    fast_app = FastAPI(title=APISettings().APP_NAME, version=APISettings().APP_VERSION, debug=APISettings().IS_DEBUG, 
+    settings = get_settings()
+    fast_app = FastAPI(title=settings.APP_NAME, version=settings.APP_VERSION, debug=settings.IS_DEBUG,
                        lifespan=lifespan
                        )
     add_cors_middleware(fast_app)
-    fast_app.include_router(api_router, prefix=APISettings().API_PREFIX)
+    add_metrics_middleware(fast_app)
+    fast_app.include_router(api_router, prefix=settings.API_PREFIX)
 
     return fast_app
 
@@ -48,4 +48,12 @@ class MergedAudioResponse(BaseModel):
     session_id: str
     merged_audio_filename: str
     transcription: str
-    audio_data_base64: str = Field(..., description="The merged audio file, Base64 encoded.")
\ No newline at end of file
+    audio_data_base64: str = Field(..., description="The merged audio file, Base64 encoded.")
+
+class MergedAudioLinkResponse(BaseModel):
+    message: str
+    session_id: str
+    merged_audio_filename: str
+    transcription: str
+    download_url: str = Field(..., description="Short-lived link to download the merged audio file.")
+    expires_in_seconds: int
@@ -0,0 +1,84 @@
+import os
+import re
+import subprocess
+from pydub import AudioSegment
+
+from app.services.audio_merge import probe_audio
+
+# Chunks are re-encoded as low-bitrate mono MP3, which is plenty for speech
+# recognition and keeps each upload well under the Whisper size limit.
+CHUNK_SAMPLE_RATE = 16000
+CHUNK_BITRATE_KBPS = 64
+SILENCE_NOISE = "-30dB"
+SILENCE_MIN_DURATION = 0.5
+
+_SILENCE_RE = re.compile(r"silence_(start|end): (-?[\d.]+)")
+
+
+def detect_silences(file_path: str) -> list[tuple[float, float]]:
+    """Returns (start, end) pairs of silent stretches found by ffmpeg's silencedetect."""
+    command = [
+        AudioSegment.converter, "-hide_banner", "-nostats", "-i", file_path,
+        "-af", f"silencedetect=noise={SILENCE_NOISE}:d={SILENCE_MIN_DURATION}",
+        "-f", "null", "-",
+    ]
+    result = subprocess.run(command, capture_output=True)
+    silences, start = [], None
+    for kind, value in _SILENCE_RE.findall(result.stderr.decode(errors="replace")):
+        if kind == "start":
+            start = max(float(value), 0.0)
+        elif start is not None:
+            silences.append((start, float(value)))
+            start = None
+    return silences
+
+
+def plan_cut_points(duration: float, silences: list[tuple[float, float]], max_seconds: float) -> list[float]:
+    """
+    Picks cut points so no chunk exceeds `max_seconds`, preferring the middle of
+    the latest silence inside each window and cutting hard only when there is none.
+    """
+    candidates = [(start + end) / 2 for start, end in silences]
+    cuts, chunk_start = [], 0.0
+    while duration - chunk_start > max_seconds:
+        window_end = chunk_start + max_seconds
+        # Ignore silences in the first quarter so chunks do not come out tiny.
+        inside = [c for c in candidates if chunk_start + max_seconds / 4 < c <= window_end]
+        cut = inside[-1] if inside else window_end
+        cuts.append(cut)
+        chunk_start = cut
+    return cuts
+
+
+def split_audio_at_silence(file_path: str, output_dir: str, max_seconds: float, max_bytes: int) -> list[str]:
+    """
+    Splits `file_path` into ordered MP3 chunks in `output_dir`, each at most
+    `max_seconds` long and `max_bytes` large, cutting at silences where possible.
+    Uses a single ffmpeg process for all chunks.
+    """
+    info = probe_audio(file_path)
+    if info is None:
+        raise ValueError(f"Could not read audio from {file_path}")
+    max_seconds = min(max_seconds, max_bytes * 8 / (CHUNK_BITRATE_KBPS * 1000) * 0.95)
+    cuts = plan_cut_points(info["duration"], detect_silences(file_path), max_seconds)
+
+    pattern = os.path.join(output_dir, "chunk_%04d.mp3")
+    command = [
+        AudioSegment.converter, "-y", "-v", "error", "-i", file_path, "-vn",
+        "-ac", "1", "-ar", str(CHUNK_SAMPLE_RATE),
+        "-c:a", "libmp3lame", "-b:a", f"{CHUNK_BITRATE_KBPS}k",
+        "-f", "segment", "-reset_timestamps", "1",
+    ]
+    if cuts:
+        command += ["-segment_times", ",".join(f"{cut:.3f}" for cut in cuts)]
+    else:
+        command += ["-segment_time", str(int(info["duration"]) + 1)]
+    result = subprocess.run(command + [pattern], capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to split audio: {result.stderr.decode(errors='replace').strip()}")
+    return sorted(os.path.join(output_dir, name) for name in os.listdir(output_dir) if name.startswith("chunk_"))
+
+
+def audio_duration(file_path: str) -> float:
+    info = probe_audio(file_path)
+    return info["duration"] if info else 0.0
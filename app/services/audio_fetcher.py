@@ -0,0 +1,94 @@
+import asyncio
+import aiohttp
+from loguru import logger
+from fastapi import HTTPException
+
+from app.core.metrics import upstream
+from app.services.uploads import ingest_stream, IngestedUpload, UPLOAD_CHUNK_SIZE
+from app.settings import get_settings
+
+
+def normalize_url(url: str) -> str:
+    url = url.strip()
+    if url.startswith("//"):
+        url = f"https:{url}"
+    return url
+
+
+class AudioFetcher:
+    """
+    Downloads remote audio straight to disk over one pooled aiohttp session.
+
+    Each download is bounded by a Content-Length pre-check, a hard byte cap
+    enforced while streaming, and total/idle timeouts.
+    """
+
+    def __init__(self, max_bytes: int, total_timeout: float, connect_timeout: float,
+                 idle_timeout: float, max_connections: int, max_concurrency: int):
+        self.max_bytes = max_bytes
+        self._timeout = aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout,
+                                              sock_read=idle_timeout)
+        self._max_connections = max_connections
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session: aiohttp.ClientSession | None = None
+
+    async def start(self) -> None:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                timeout=self._timeout,
+                connector=aiohttp.TCPConnector(limit=self._max_connections),
+            )
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def fetch_to_file(self, url: str, dest_path: str, allowed_mime_types: list[str]) -> IngestedUpload:
+        """Streams `url` to `dest_path`, validating its MIME type from the first bytes."""
+        url = normalize_url(url)
+        await self.start()
+        try:
+            async with self._semaphore, upstream("download", "audio"), self._session.get(url) as response:
+                response.raise_for_status()
+                if response.content_length is not None and response.content_length > self.max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Remote file too large. Maximum size is {self.max_bytes // (1024 * 1024)} MB.")
+                upload = await ingest_stream(response.content.iter_chunked(UPLOAD_CHUNK_SIZE),
+                                             allowed_mime_types, self.max_bytes, kind="audio",
+                                             dest_path=dest_path)
+                logger.info(f"Successfully downloaded audio from {url} ({upload.size} bytes)")
+                return upload
+        except HTTPException:
+            raise
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out downloading {url}")
+            raise HTTPException(status_code=504, detail="Timed out while downloading from URL.")
+        except aiohttp.ClientError as e:
+            logger.error(f"Network or client error during download of {url}: {e}")
+            raise HTTPException(status_code=500, detail="Network or client error while downloading from URL.")
+        except Exception as e:
+            logger.error(f"An unexpected error occurred while downloading {url}: {e}")
+            raise HTTPException(status_code=500, detail="Failed to download audio from URL.")
+
+    async def fetch_many(self, urls: list[str], dest_paths: list[str],
+                         allowed_mime_types: list[str]) -> list[IngestedUpload | HTTPException]:
+        """Fetches several URLs concurrently. Failures are returned in place, not raised."""
+        results = await asyncio.gather(
+            *(self.fetch_to_file(url, path, allowed_mime_types) for url, path in zip(urls, dest_paths)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, HTTPException):
+                raise result
+        return results
+
+
+_settings = get_settings()
+audio_fetcher = AudioFetcher(
+    max_bytes=_settings.AUDIO_FETCH_MAX_BYTES,
+    total_timeout=_settings.AUDIO_FETCH_TOTAL_TIMEOUT,
+    connect_timeout=_settings.AUDIO_FETCH_CONNECT_TIMEOUT,
+    idle_timeout=_settings.AUDIO_FETCH_IDLE_TIMEOUT,
+    max_connections=_settings.AUDIO_FETCH_MAX_CONNECTIONS,
+    max_concurrency=_settings.AUDIO_FETCH_MAX_CONCURRENCY,
+)
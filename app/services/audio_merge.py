@@ -0,0 +1,138 @@
+import json
+import os
+import subprocess
+from loguru import logger
+from pydub import AudioSegment
+from pydub.utils import get_prober_name
+
+from app.core.process_pool import audio_pool
+
+MERGE_SAMPLE_RATE = 44100
+MERGE_CHANNEL_LAYOUT = "stereo"
+MERGE_BITRATE = "192k"
+
+
+class AudioMergeError(Exception):
+    """Raised when none of the session clips could be merged."""
+
+
+def probe_audio(file_path: str) -> dict | None:
+    """
+    Reads codec, sample rate and channel count of the first audio stream with ffprobe.
+    Returns None if the file has no decodable audio.
+    """
+    command = [
+        get_prober_name(), "-v", "error", "-select_streams", "a:0",
+        "-show_entries", "stream=codec_name,sample_rate,channels:format=duration",
+        "-of", "json", file_path,
+    ]
+    result = subprocess.run(command, capture_output=True)
+    if result.returncode != 0:
+        return None
+    info = json.loads(result.stdout or b"{}")
+    streams = info.get("streams") or []
+    if not streams:
+        return None
+    stream = streams[0]
+    return {
+        "codec_name": stream.get("codec_name"),
+        "sample_rate": int(stream.get("sample_rate") or 0),
+        "channels": int(stream.get("channels") or 0),
+        "duration": float(info.get("format", {}).get("duration") or 0.0),
+    }
+
+
+def _concat_list_entry(file_path: str) -> str:
+    escaped = os.path.abspath(file_path).replace("'", "'\\''")
+    return f"file '{escaped}'\n"
+
+
+def normalize_clip(file_path: str, output_path: str) -> None:
+    """
+    Re-encodes one clip to the common merge format (MP3 at MERGE_SAMPLE_RATE,
+    MERGE_CHANNEL_LAYOUT, MERGE_BITRATE), so normalized clips can later be
+    concatenated frame by frame. The output appears atomically.
+    """
+    part_path = f"{output_path}.part"
+    command = [
+        AudioSegment.converter, "-y", "-v", "error", "-i", file_path, "-vn",
+        "-af", f"aresample={MERGE_SAMPLE_RATE},aformat=sample_fmts=fltp:channel_layouts={MERGE_CHANNEL_LAYOUT}",
+        "-c:a", "libmp3lame", "-b:a", MERGE_BITRATE, "-f", "mp3", part_path,
+    ]
+    result = subprocess.run(command, capture_output=True)
+    if result.returncode != 0:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise RuntimeError(f"ffmpeg failed to normalize {file_path}: {result.stderr.decode(errors='replace').strip()}")
+    os.replace(part_path, output_path)
+
+
+def _copy_concat_command(file_paths: list[str], list_path: str, output_path: str) -> list[str]:
+    with open(list_path, "w", encoding="utf-8") as list_file:
+        list_file.writelines(_concat_list_entry(file_path) for file_path in file_paths)
+    return [
+        AudioSegment.converter, "-y", "-v", "error",
+        "-f", "concat", "-safe", "0", "-i", list_path,
+        "-map", "0:a", "-c:a", "copy", output_path,
+    ]
+
+
+def merge_audio_files(file_paths: list[str], output_path: str, prenormalized: bool = False) -> int:
+    """
+    Merges audio files in order into a single MP3 at `output_path` using one
+    ffmpeg process, so memory stays bounded regardless of clip count.
+
+    If every clip is MP3 with the same sample rate and channel count, MP3 frames
+    are concatenated without re-encoding. Otherwise the clips are decoded,
+    resampled to a common layout and streamed through a single encoder.
+    Clips that cannot be decoded are skipped. With `prenormalized`, all clips
+    come from `normalize_clip` and are concatenated without probing.
+    Returns the number of clips merged.
+    """
+    list_path = f"{output_path}.txt"
+    if prenormalized:
+        clips = list(file_paths)
+        command = _copy_concat_command(clips, list_path, output_path)
+    else:
+        clips, formats = [], set()
+        for file_path in file_paths:
+            info = probe_audio(file_path)
+            if info is None or info["duration"] <= 0:
+                logger.warning(f"Could not load audio file {file_path}. Skipping.")
+                continue
+            clips.append(file_path)
+            formats.add((info["codec_name"], info["sample_rate"], info["channels"]))
+        if not clips:
+            raise AudioMergeError("No audio data could be processed.")
+
+        if len(formats) == 1 and next(iter(formats))[0] == "mp3":
+            command = _copy_concat_command(clips, list_path, output_path)
+        else:
+            command = [AudioSegment.converter, "-y", "-v", "error"]
+            for file_path in clips:
+                command += ["-i", file_path]
+            filters = [
+                f"[{i}:a:0]aresample={MERGE_SAMPLE_RATE},"
+                f"aformat=sample_fmts=fltp:channel_layouts={MERGE_CHANNEL_LAYOUT}[a{i}]"
+                for i in range(len(clips))
+            ]
+            inputs = "".join(f"[a{i}]" for i in range(len(clips)))
+            filters.append(f"{inputs}concat=n={len(clips)}:v=0:a=1[out]")
+            command += [
+                "-filter_complex", ";".join(filters), "-map", "[out]",
+                "-c:a", "libmp3lame", "-b:a", MERGE_BITRATE, output_path,
+            ]
+
+    try:
+        result = subprocess.run(command, capture_output=True)
+    finally:
+        if os.path.exists(list_path):
+            os.remove(list_path)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to merge audio: {result.stderr.decode(errors='replace').strip()}")
+    return len(clips)
+
+
+async def merge_session_audio(file_paths: list[str], output_path: str, prenormalized: bool = False) -> int:
+    """Runs `merge_audio_files` in the audio process pool."""
+    return await audio_pool.run(merge_audio_files, file_paths, output_path, prenormalized)
@@ -0,0 +1,101 @@
+import asyncio
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, AsyncIterator
+
+
+def atomic_write(path: str, data: bytes | str) -> None:
+    """
+    Writes `data` to `path` through a temp file in the same directory and a
+    rename, so readers see either the old or the new contents, never a partial file.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        if isinstance(data, bytes):
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_json(path: str, value: Any) -> None:
+    atomic_write(path, json.dumps(value))
+
+
+def read_json(path: str, default: Any = None) -> Any:
+    """Parsed contents of a JSON file, or `default` if it does not exist. Raises ValueError if it is corrupt."""
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return default
+
+
+# Async wrappers for the routes and services: the blocking calls run in the
+# default thread pool, so a slow disk stalls one request instead of the event loop.
+
+async def write_file(path: str, data: bytes | str) -> None:
+    await asyncio.to_thread(atomic_write, path, data)
+
+
+async def write_json(path: str, value: Any) -> None:
+    await asyncio.to_thread(atomic_write_json, path, value)
+
+
+async def load_json(path: str, default: Any = None) -> Any:
+    return await asyncio.to_thread(read_json, path, default)
+
+
+async def read_bytes(path: str) -> bytes:
+    def read() -> bytes:
+        with open(path, "rb") as file:
+            return file.read()
+    return await asyncio.to_thread(read)
+
+
+async def stat(path: str) -> os.stat_result | None:
+    """os.stat(path), or None if the file does not exist."""
+    try:
+        return await asyncio.to_thread(os.stat, path)
+    except FileNotFoundError:
+        return None
+
+
+async def remove(path: str) -> None:
+    """Removes a file; a missing file is not an error."""
+    with contextlib.suppress(FileNotFoundError):
+        await asyncio.to_thread(os.remove, path)
+
+
+async def move(source: str, destination: str) -> None:
+    await asyncio.to_thread(shutil.move, source, destination)
+
+
+async def touch(path: str) -> None:
+    """Sets the file's modification time to now."""
+    await asyncio.to_thread(os.utime, path)
+
+
+async def makedirs(path: str) -> None:
+    await asyncio.to_thread(os.makedirs, path, exist_ok=True)
+
+
+@contextlib.asynccontextmanager
+async def temporary_directory() -> AsyncIterator[str]:
+    """Async counterpart of tempfile.TemporaryDirectory: created and removed off the event loop."""
+    path = await asyncio.to_thread(tempfile.mkdtemp)
+    try:
+        yield path
+    finally:
+        await asyncio.to_thread(shutil.rmtree, path, ignore_errors=True)
@@ -0,0 +1,105 @@
+import asyncio
+import io
+from cachetools import LRUCache
+from loguru import logger
+from PIL import Image, ImageOps
+
+from app.core.metrics import STAGE_LATENCY, service_stats, timed
+from app.services.prompt_requests import ImageInput
+from app.services.uploads import IngestedUpload
+from app.settings import get_settings
+
+_settings = get_settings()
+
+OUTPUT_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+
+def preprocess_image(data: bytes, max_side: int, output_format: str, quality: int) -> bytes:
+    """
+    Decodes an image, applies its EXIF orientation, caps the longest side at
+    `max_side` and re-encodes it without metadata. Runs in a worker thread:
+    Pillow releases the GIL while decoding, resizing and encoding.
+    Animated images keep their first frame only.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        # Lets the JPEG decoder downscale by a power of two while decoding.
+        image.draft("RGB", (max_side, max_side))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+        if output_format == "JPEG" and image.mode != "RGB":
+            if image.mode in ("RGBA", "LA", "P"):
+                image = image.convert("RGBA")
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel("A"))
+                image = background
+            else:
+                image = image.convert("RGB")
+        elif output_format == "WEBP" and image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() or image.mode == "P" else "RGB")
+
+        output = io.BytesIO()
+        # No exif/icc_profile arguments, so no metadata is written.
+        image.save(output, format=output_format, quality=quality, optimize=output_format == "JPEG")
+        return output.getvalue()
+
+
+class ImagePreprocessor:
+    """
+    Shrinks reference images before they are sent to vision models.
+
+    Results are cached by content hash, so repeated prompt updates with the same
+    reference image skip the work. The work runs in threads, at most
+    `concurrency` at a time, so it never queues behind audio merges in the
+    process pool. If the image cannot be decoded, the original bytes are used unchanged.
+    """
+
+    def __init__(self, max_side: int, output_format: str, quality: int, maxsize: int, concurrency: int):
+        self.max_side = max_side
+        self.output_format = output_format.upper()
+        self.quality = quality
+        self._cache: LRUCache = LRUCache(maxsize=maxsize)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._hits = 0
+        self._misses = 0
+
+    async def prepare(self, upload: IngestedUpload) -> ImageInput:
+        """Returns the image to send to the models for an ingested image upload."""
+        cached = self._cache.get(upload.sha256)
+        if cached is not None:
+            self._hits += 1
+            return cached
+        self._misses += 1
+
+        try:
+            async with self._semaphore:
+                with timed(STAGE_LATENCY, stage=preprocess_image.__name__):
+                    data = await asyncio.to_thread(preprocess_image, upload.data, self.max_side,
+                                                   self.output_format, self.quality)
+        except (OSError, Image.DecompressionBombError) as e:
+            logger.warning(f"Could not preprocess reference image {upload.sha256[:12]}, sending it unchanged: {e}")
+            return ImageInput(upload.data, upload.mime_type, upload.sha256)
+
+        image = ImageInput.from_bytes(data, OUTPUT_MIME_TYPES[self.output_format])
+        self._cache[upload.sha256] = image
+        logger.info(f"Preprocessed reference image: {upload.size} -> {len(data)} bytes")
+        return image
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": self._hits / lookups if lookups else 0.0,
+            "size": len(self._cache),
+        }
+
+
+image_preprocessor = ImagePreprocessor(
+    max_side=_settings.IMAGE_MAX_SIDE,
+    output_format=_settings.IMAGE_OUTPUT_FORMAT,
+    quality=_settings.IMAGE_QUALITY,
+    maxsize=_settings.IMAGE_CACHE_MAX_SIZE,
+    concurrency=_settings.IMAGE_PREPROCESS_CONCURRENCY,
+)
+service_stats.register("image_preprocessor", image_preprocessor.stats)
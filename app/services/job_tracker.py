@@ -0,0 +1,188 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+from loguru import logger
+
+from app.core.metrics import service_stats
+from app.services.status_cache import status_cache, TERMINAL_STATUSES
+from app.settings import get_settings
+
+
+@dataclass
+class Job:
+    image_id: str
+    interval: float
+    next_poll: float
+    created_at: float
+    last_state: tuple | None = None
+    last_event: dict | None = None
+    errors: int = 0
+    subscribers: set[asyncio.Queue] = field(default_factory=set)
+
+
+class JobTracker:
+    """
+    Polls in-flight Imagine generations from one background loop and pushes
+    status changes to subscribers, instead of every client polling on its own.
+
+    Each job backs off geometrically while its status and progress are unchanged,
+    and snaps back to the minimum interval as soon as something moves.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[dict]],
+        min_interval: float,
+        max_interval: float,
+        backoff: float,
+        batch_size: int,
+        max_age: float,
+        max_errors: int,
+    ):
+        self._fetch = fetch
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self.max_errors = max_errors
+        self._jobs: dict[str, Job] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def register(self, image_id: str) -> Job:
+        job = self._jobs.get(image_id)
+        if job is None:
+            now = time.monotonic()
+            job = Job(image_id=image_id, interval=self.min_interval, next_poll=now, created_at=now)
+            self._jobs[image_id] = job
+            self._wakeup.set()
+        return job
+
+    def subscribe(self, image_id: str) -> asyncio.Queue:
+        """Returns a queue of events for the job, starting with its last known state."""
+        job = self.register(image_id)
+        queue: asyncio.Queue = asyncio.Queue()
+        if job.last_event is not None:
+            queue.put_nowait(job.last_event)
+        job.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, image_id: str, queue: asyncio.Queue) -> None:
+        job = self._jobs.get(image_id)
+        if job is not None:
+            job.subscribers.discard(queue)
+
+    async def events(self, image_id: str, keepalive: float):
+        """
+        Yields the job's events until it finishes, and None whenever `keepalive`
+        seconds pass without one.
+        """
+        queue = self.subscribe(image_id)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if event["event"] != "progress":
+                    return
+        finally:
+            self.unsubscribe(image_id, queue)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "jobs": len(self._jobs),
+            "subscribers": sum(len(job.subscribers) for job in self._jobs.values()),
+        }
+
+    async def _run(self) -> None:
+        while True:
+            now = time.monotonic()
+            due = sorted((job for job in self._jobs.values() if job.next_poll <= now),
+                         key=lambda job: job.next_poll)[:self.batch_size]
+            if due:
+                results = await asyncio.gather(*(self._fetch(job.image_id) for job in due),
+                                               return_exceptions=True)
+                for job, result in zip(due, results):
+                    self._update(job, result)
+
+            self._wakeup.clear()
+            next_poll = min((job.next_poll for job in self._jobs.values()), default=None)
+            timeout = self.max_interval if next_poll is None else max(next_poll - time.monotonic(), 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _update(self, job: Job, result: dict | BaseException) -> None:
+        now = time.monotonic()
+        if isinstance(result, BaseException):
+            job.errors += 1
+            logger.warning(f"Status poll failed for job {job.image_id} ({job.errors}/{self.max_errors}): {result}")
+            if job.errors >= self.max_errors:
+                self._finish(job, {"event": "error", "data": {"id": job.image_id, "detail": str(result)}})
+                return
+            job.interval = min(job.interval * self.backoff, self.max_interval)
+            job.next_poll = now + job.interval
+            return
+
+        job.errors = 0
+        data = result['data']
+        status = data['status']
+        if status in TERMINAL_STATUSES:
+            self._finish(job, {"event": status, "data": data})
+            return
+
+        state = (status, data.get('progress'))
+        if state != job.last_state:
+            job.last_state = state
+            job.interval = self.min_interval
+            self._publish(job, {"event": "progress",
+                                "data": {"id": job.image_id, "status": status, "progress": data.get('progress')}})
+        else:
+            job.interval = min(job.interval * self.backoff, self.max_interval)
+
+        if now - job.created_at > self.max_age:
+            self._finish(job, {"event": "error", "data": {"id": job.image_id, "detail": "Job tracking timed out."}})
+            return
+        job.next_poll = now + job.interval
+
+    def _publish(self, job: Job, event: dict) -> None:
+        job.last_event = event
+        for queue in job.subscribers:
+            queue.put_nowait(event)
+
+    def _finish(self, job: Job, event: dict) -> None:
+        self._publish(job, event)
+        self._jobs.pop(job.image_id, None)
+
+
+_settings = get_settings()
+job_tracker = JobTracker(
+    fetch=status_cache.get,
+    min_interval=_settings.JOB_POLL_MIN_INTERVAL,
+    max_interval=_settings.JOB_POLL_MAX_INTERVAL,
+    backoff=_settings.JOB_POLL_BACKOFF,
+    batch_size=_settings.JOB_POLL_BATCH_SIZE,
+    max_age=_settings.JOB_MAX_AGE,
+    max_errors=_settings.JOB_MAX_ERRORS,
+)
+SSE_KEEPALIVE_INTERVAL = _settings.SSE_KEEPALIVE_INTERVAL
+service_stats.register("job_tracker", job_tracker.stats)
@@ -0,0 +1,214 @@
+import asyncio
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable
+from loguru import logger
+
+from app.core.metrics import service_stats
+from app.services.prompt_generator import (
+    generate_prompt_gemini,
+    generate_prompt_openai,
+    stream_prompt_gemini,
+    stream_prompt_openai,
+)
+from app.settings import get_settings
+
+Provider = Callable[..., Awaitable[dict]]
+StreamProvider = Callable[..., AsyncIterator[str]]
+
+
+class ProviderHealth:
+    """Rolling latency and error rate over a provider's last `window` calls."""
+
+    def __init__(self, window: int):
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.last_error = 0.0
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.latencies.append(latency)
+        self.outcomes.append(ok)
+        if not ok:
+            self.last_error = time.monotonic()
+
+    def record_cancelled(self, elapsed: float) -> None:
+        """A hedged call that lost took at least `elapsed`; keep that as a latency sample."""
+        self.latencies.append(elapsed)
+
+    def percentile(self, q: float) -> float | None:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+
+class LLMRouter:
+    """
+    Routes prompt generation to the fastest healthy provider.
+
+    Providers are ranked by rolling p50 latency; one whose error rate is above
+    `max_error_rate` (over at least `min_samples` calls) is tried last until
+    `cooldown` seconds after its last error. With hedging on, a second provider
+    is started if the first has not answered within its p95, and whichever
+    finishes first wins while the other call is cancelled. A failed call falls
+    over to the next provider.
+    """
+
+    def __init__(self, providers: dict[str, Provider], stream_providers: dict[str, StreamProvider] | None = None,
+                 hedge: bool = False, hedge_min_delay: float = 0.5,
+                 hedge_default_delay: float = 2.0, window: int = 100, max_error_rate: float = 0.5,
+                 min_samples: int = 5, cooldown: float = 30.0):
+        self.providers = providers
+        self.stream_providers = stream_providers or {}
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_default_delay = hedge_default_delay
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.health = {name: ProviderHealth(window) for name in providers}
+        self._hedges = 0
+        self._hedge_wins = 0
+
+    def is_healthy(self, name: str) -> bool:
+        health = self.health[name]
+        return (
+            len(health.outcomes) < self.min_samples
+            or health.error_rate <= self.max_error_rate
+            or time.monotonic() - health.last_error > self.cooldown
+        )
+
+    def ranked(self) -> list[str]:
+        """Providers in the order to try them: healthy before unhealthy, then by p50."""
+        # Providers without samples rank first, so each one gets measured.
+        return sorted(self.providers, key=lambda name: (
+            not self.is_healthy(name), self.health[name].percentile(0.5) or 0.0,
+        ))
+
+    def hedge_delay(self, name: str) -> float:
+        p95 = self.health[name].percentile(0.95)
+        return max(self.hedge_min_delay, p95 if p95 is not None else self.hedge_default_delay)
+
+    async def generate(self, **kwargs) -> dict:
+        """Generates a prompt with the same arguments as the generate_prompt_* functions."""
+        candidates = self.ranked()
+        running: dict[asyncio.Task, str] = {}
+        last_error: Exception | None = None
+
+        def launch() -> None:
+            name = candidates.pop(0)
+            running[asyncio.create_task(self._call(name, kwargs))] = name
+
+        launch()
+        first, hedged = next(iter(running.values())), False
+        try:
+            while running:
+                timeout = None
+                if self.hedge and candidates and len(running) == 1:
+                    timeout = self.hedge_delay(next(iter(running.values())))
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self._hedges += 1
+                    hedged = True
+                    logger.info(f"Hedging prompt request to '{candidates[0]}'")
+                    launch()
+                    continue
+                for task in done:
+                    name = running.pop(task)
+                    if task.exception() is None:
+                        if hedged and name != first:
+                            self._hedge_wins += 1
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning(f"Prompt generation with '{name}' failed: {last_error}")
+                if not running and candidates:
+                    launch()
+        finally:
+            for task in running:
+                task.cancel()
+        raise last_error
+
+    async def stream(self, **kwargs) -> AsyncIterator[str]:
+        """
+        Streams the raw completion from the fastest healthy provider. A provider that
+        fails before producing any output falls over to the next one; streams are not hedged.
+        """
+        last_error: Exception | None = None
+        for name in self.ranked():
+            if name not in self.stream_providers:
+                continue
+            health = self.health[name]
+            started, produced = time.monotonic(), False
+            try:
+                async for chunk in self.stream_providers[name](**kwargs):
+                    produced = True
+                    yield chunk
+            except Exception as e:
+                health.record(time.monotonic() - started, ok=False)
+                if produced:
+                    raise
+                last_error = e
+                logger.warning(f"Prompt streaming with '{name}' failed: {e}")
+                continue
+            health.record(time.monotonic() - started, ok=True)
+            return
+        raise last_error or RuntimeError("No streaming prompt provider is configured.")
+
+    async def _call(self, name: str, kwargs: dict) -> dict:
+        health = self.health[name]
+        started = time.monotonic()
+        try:
+            result = await self.providers[name](**kwargs)
+        except asyncio.CancelledError:
+            health.record_cancelled(time.monotonic() - started)
+            raise
+        except Exception:
+            health.record(time.monotonic() - started, ok=False)
+            raise
+        health.record(time.monotonic() - started, ok=True)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "providers": {
+                name: {
+                    "p50": health.percentile(0.5),
+                    "p95": health.percentile(0.95),
+                    "error_rate": health.error_rate,
+                    "healthy": self.is_healthy(name),
+                }
+                for name, health in self.health.items()
+            },
+            "hedges": self._hedges,
+            "hedge_wins": self._hedge_wins,
+        }
+
+
+PROVIDERS: dict[str, Provider] = {
+    "openai": generate_prompt_openai,
+    "gemini": generate_prompt_gemini,
+}
+
+STREAM_PROVIDERS: dict[str, StreamProvider] = {
+    "openai": stream_prompt_openai,
+    "gemini": stream_prompt_gemini,
+}
+
+_settings = get_settings()
+
+llm_router = LLMRouter(
+    {name: PROVIDERS[name] for name in _settings.LLM_PROVIDERS},
+    {name: STREAM_PROVIDERS[name] for name in _settings.LLM_PROVIDERS},
+    hedge=_settings.LLM_HEDGE_ENABLED,
+    hedge_min_delay=_settings.LLM_HEDGE_MIN_DELAY,
+    hedge_default_delay=_settings.LLM_HEDGE_DEFAULT_DELAY,
+    window=_settings.LLM_LATENCY_WINDOW,
+    max_error_rate=_settings.LLM_MAX_ERROR_RATE,
+    min_samples=_settings.LLM_MIN_SAMPLES,
+    cooldown=_settings.LLM_UNHEALTHY_COOLDOWN,
+)
+service_stats.register("llm_router", llm_router.stats)
@@ -1,13 +1,17 @@
-import os
 import json
-import base64
-from google import genai
-from openai import OpenAI
-from dotenv import load_dotenv
-from google.genai import types
+import asyncio
+from typing import TYPE_CHECKING, AsyncIterator
+from cachetools import TTLCache
+from loguru import logger
+from app.core.clients import clients
+from app.core.metrics import count_cache_lookup, upstream
+from app.settings import get_settings
+from app.services.prompt_requests import ImageInput, PromptRequest, gemini_contents, openai_messages
 
-load_dotenv(override=True)
-gemini_client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+if TYPE_CHECKING:
+    from google.genai import types
+
+settings = get_settings()
 
 SYSTEM_INSTRUCTION_CREATE = """
 You are a creative assistant for AI art generation. Your task is to write a single, vivid MidJourney prompt based on a user's scenario.
@@ -40,9 +44,89 @@ Instructions:
 5.  Your entire output must be a single JSON object in the format: {"prompt": "<your new, updated prompt text here>"}. Do not include any other text or explanations.
 """
 
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+OPENAI_MODEL = "gpt-4.1-nano-2025-04-14"
+GEMINI_MODEL = "gemini-2.5-flash-lite"
+
+# Per-provider limits on in-flight LLM calls, so a burst of prompt requests
+# queues here instead of tripping the vendors' rate limits.
+openai_semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+gemini_semaphore = asyncio.Semaphore(settings.GEMINI_MAX_CONCURRENCY)
+
+# Bump whenever a SYSTEM_INSTRUCTION_* text changes, so cached prompts from the
+# old instructions are not served.
+SYSTEM_INSTRUCTION_VERSION = "1"
+
+# Opt-in cache of generated prompts (PROMPT_CACHE_ENABLED).
+prompt_cache = TTLCache(maxsize=settings.PROMPT_CACHE_MAX_SIZE, ttl=settings.PROMPT_CACHE_TTL)
+
+
+def _normalize(value: str | None) -> str:
+    return " ".join(value.split()).casefold() if value else ""
+
+
+def _prompt_cache_key(provider: str, model: str, image_hash: str | None, **fields: str | None) -> tuple:
+    """
+    Cache key from whitespace- and case-normalized form fields, the provider and
+    model, the system instruction version and a hash of the reference image.
+    """
+    normalized = tuple(_normalize(fields[name]) for name in sorted(fields))
+    return (provider, model, SYSTEM_INSTRUCTION_VERSION, image_hash) + normalized
+
+
+def _preferences_text(place, time, object, action, style, other) -> str:
+    return f"""
+            - place: {place}
+            - time: {time}
+            - object or person: {object}
+            - action: {action}
+            - artistic style: {style}
+            - other elements: {other}
+        """
+
+
+def build_prompt_request(place, time, object, action, style, other, previous_prompt,
+                         image: ImageInput | None) -> PromptRequest:
+    """
+    Builds the provider-neutral request for creating a prompt, creating one
+    inspired by a reference image, or updating a previous prompt with an image.
+    """
+    if previous_prompt and image:
+        return PromptRequest(SYSTEM_INSTRUCTION_UPDATE,
+                             f"Here is the previous prompt to update:\n\n{previous_prompt}", image)
+    if image:
+        return PromptRequest(SYSTEM_INSTRUCTION_REF_IMAGE,
+                             _preferences_text(place, time, object, action, style, other), image)
+    return PromptRequest(SYSTEM_INSTRUCTION_CREATE, _preferences_text(place, time, object, action, style, other))
+
+
+def _gemini_config(request: PromptRequest) -> "types.GenerateContentConfig":
+    from google.genai import types
+
+    return types.GenerateContentConfig(
+        temperature=1.0, top_p=0.95, top_k=40, max_output_tokens=8192,
+        system_instruction=[
+            types.Part.from_text(text=request.system_instruction)],
+        response_mime_type="application/json",
+    )
+
+
+def _cache_key_for(provider: str, model: str, use_cache: bool, place, time, object, action, style,
+                   other, previous_prompt, image: ImageInput | None) -> tuple | None:
+    if not (settings.PROMPT_CACHE_ENABLED and use_cache):
+        return None
+    return _prompt_cache_key(
+        provider, model, image.sha256 if image else None, place=place, time=time, object=object,
+        action=action, style=style, other=other, previous_prompt=previous_prompt,
+    )
+
+
+def _cached_prompt(cache_key: tuple) -> dict | None:
+    cached = prompt_cache.get(cache_key)
+    count_cache_lookup("prompt", cached is not None)
+    return cached
+
 
-def generate_prompt_openai(
+async def generate_prompt_openai(
     place: str = None,
     time: str = None,
     object: str = None,
@@ -50,89 +134,85 @@ def generate_prompt_openai(
     style: str = None,
     other: str = None,
     previous_prompt: str = None,
-    image_bytes: bytes | None = None,
-    mime_type: str | None = None
+    image: ImageInput | None = None,
+    use_cache: bool = True
 ) -> dict:
     """
     Generates or updates a prompt using the OpenAI API.
 
     - If text preferences (place, time, etc.) are provided, it creates a new prompt using a text model.
     - If a previous_prompt and an image are provided, it updates the prompt using a vision model.
+    - When PROMPT_CACHE_ENABLED is set, identical requests are answered from the prompt cache
+      unless `use_cache` is False.
     """
-    if (previous_prompt and image_bytes):
-        base64_image = base64.b64encode(image_bytes).decode('utf-8')
-        messages = [
-            {"role": "system", "content": SYSTEM_INSTRUCTION_UPDATE},
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": f"Here is the previous prompt to update:\n\n{previous_prompt}"},
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": f"data:{mime_type};base64,{base64_image}"}
-                    }
-                ]
-            }
-        ]
-        
-        model = "gpt-4.1-nano-2025-04-14"
-    elif image_bytes and (not previous_prompt):
-        base64_image = base64.b64encode(image_bytes).decode('utf-8')
-        messages = [
-            {"role": "system", "content": SYSTEM_INSTRUCTION_REF_IMAGE},
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": f"""
-                        - place: {place}
-                        - time: {time}
-                        - object or person: {object}
-                        - action: {action}
-                        - artistic style: {style}
-                        - other elements: {other}
-                    """},
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": f"data:{mime_type};base64,{base64_image}"}
-                    }
-                ]
-            }
-        ]
-        
-        model = "gpt-4.1-nano-2025-04-14"
-
-    else:
-        user_prompt_text = f"""
-            - place: {place}
-            - time: {time}
-            - object or person: {object}
-            - action: {action}
-            - artistic style: {style}
-            - other elements: {other}
-        """
-        
-        messages = [
-            {"role": "system", "content": SYSTEM_INSTRUCTION_CREATE},
-            {"role": "user", "content": user_prompt_text}
-        ]
-        
-        model = "gpt-4.1-nano-2025-04-14"
+    model = OPENAI_MODEL
+    cache_key = _cache_key_for("openai", model, use_cache, place, time, object, action, style,
+                               other, previous_prompt, image)
+    if cache_key is not None and (cached := _cached_prompt(cache_key)) is not None:
+        return dict(cached)
 
+    messages = openai_messages(build_prompt_request(place, time, object, action, style, other,
+                                                    previous_prompt, image))
     try:
-        response = openai_client.chat.completions.create(
+        async with openai_semaphore, upstream("openai", "chat"):
+            response = await clients.get("openai").chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.8,
+                response_format={"type": "json_object"}
+            )
+        prompt_data = json.loads(response.choices[0].message.content)
+        if cache_key is not None:
+            prompt_cache[cache_key] = dict(prompt_data)
+        return prompt_data
+    
+    except Exception as e:
+        logger.error(f"An error occurred with the OpenAI API: {e}")
+        raise
+
+
+async def stream_prompt_openai(
+    place: str = None,
+    time: str = None,
+    object: str = None,
+    action: str = None,
+    style: str = None,
+    other: str = None,
+    previous_prompt: str = None,
+    image: ImageInput | None = None,
+    use_cache: bool = True
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of `generate_prompt_openai`: yields the raw JSON completion
+    as it is produced. A cached prompt is yielded as one chunk.
+    """
+    model = OPENAI_MODEL
+    cache_key = _cache_key_for("openai", model, use_cache, place, time, object, action, style,
+                               other, previous_prompt, image)
+    if cache_key is not None and (cached := _cached_prompt(cache_key)) is not None:
+        yield json.dumps(cached)
+        return
+
+    messages = openai_messages(build_prompt_request(place, time, object, action, style, other,
+                                                    previous_prompt, image))
+    completion = []
+    async with openai_semaphore, upstream("openai", "chat_stream"):
+        stream = await clients.get("openai").chat.completions.create(
             model=model,
             messages=messages,
             temperature=0.8,
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+            stream=True,
         )
-        return json.loads(response.choices[0].message.content)
-    
-    except Exception as e:
-        print(f"An error occurred with the OpenAI API: {e}")
-        raise
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                completion.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+    if cache_key is not None:
+        prompt_cache[cache_key] = json.loads("".join(completion))
 
 
-def generate_prompt_gemini(
+async def generate_prompt_gemini(
     place: str = None,
     time: str = None,
     object: str = None,
@@ -140,48 +220,70 @@ def generate_prompt_gemini(
     style: str = None,
     other: str = None,
     previous_prompt: str = None,
-    image_bytes: bytes | None = None,
-    mime_type: str | None = None
+    image: ImageInput | None = None,
+    use_cache: bool = True
 ) -> dict:
     """
     Generates or updates a prompt using Gemini.
     - If place, time, etc., are provided, it creates a new prompt.
+    - If an image is provided without a previous_prompt, it creates a new prompt inspired by the image.
     - If previous_prompt and an image are provided, it updates the prompt.
+    - When PROMPT_CACHE_ENABLED is set, identical requests are answered from the prompt cache
+      unless `use_cache` is False.
     """
-    model_name = "gemini-2.5-flash-lite"
-    parts = []
-    
-    if previous_prompt and image_bytes:
-        system_instruction = SYSTEM_INSTRUCTION_UPDATE
-        text_content = f"Here is the previous prompt to update:\n\n{previous_prompt}"
-        parts.append(types.Part.from_text(text=text_content))
-        image_part = types.Part.from_bytes(data=image_bytes, mime_type=mime_type)
-        parts.append(image_part)
-    else:
-        system_instruction = SYSTEM_INSTRUCTION_CREATE
-        text_prompt = f"""
-            - place: {place}
-            - time: {time}
-            - object or person: {object}
-            - action: {action}
-            - artistic style: {style}
-            - other elements: {other}
-        """
-        parts.append(types.Part.from_text(text=text_prompt))
+    model_name = GEMINI_MODEL
+    cache_key = _cache_key_for("gemini", model_name, use_cache, place, time, object, action, style,
+                               other, previous_prompt, image)
+    if cache_key is not None and (cached := _cached_prompt(cache_key)) is not None:
+        return dict(cached)
 
-    contents = [types.Content(role="user", parts=parts)]
-    
-    generate_content_config = types.GenerateContentConfig(
-        temperature=1.0, top_p=0.95, top_k=40, max_output_tokens=8192,
-        system_instruction=[
-            types.Part.from_text(text=system_instruction)],
-        response_mime_type="application/json",
-    )
+    request = build_prompt_request(place, time, object, action, style, other, previous_prompt, image)
+    async with gemini_semaphore, upstream("gemini", "generate"):
+        response = await clients.get("gemini").aio.models.generate_content(
+            model=model_name,
+            contents=gemini_contents(request),
+            config=_gemini_config(request),
+        )
 
-    response = gemini_client.models.generate_content(
-        model=model_name,
-        contents=contents,
-        config=generate_content_config,
-    ).text
+    prompt_data = json.loads(response.text)
+    if cache_key is not None:
+        prompt_cache[cache_key] = dict(prompt_data)
+    return prompt_data
 
-    return json.loads(response)
\ No newline at end of file
+
+async def stream_prompt_gemini(
+    place: str = None,
+    time: str = None,
+    object: str = None,
+    action: str = None,
+    style: str = None,
+    other: str = None,
+    previous_prompt: str = None,
+    image: ImageInput | None = None,
+    use_cache: bool = True
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of `generate_prompt_gemini`: yields the raw JSON completion
+    as it is produced. A cached prompt is yielded as one chunk.
+    """
+    model_name = GEMINI_MODEL
+    cache_key = _cache_key_for("gemini", model_name, use_cache, place, time, object, action, style,
+                               other, previous_prompt, image)
+    if cache_key is not None and (cached := _cached_prompt(cache_key)) is not None:
+        yield json.dumps(cached)
+        return
+
+    request = build_prompt_request(place, time, object, action, style, other, previous_prompt, image)
+    completion = []
+    async with gemini_semaphore, upstream("gemini", "generate_stream"):
+        stream = await clients.get("gemini").aio.models.generate_content_stream(
+            model=model_name,
+            contents=gemini_contents(request),
+            config=_gemini_config(request),
+        )
+        async for chunk in stream:
+            if chunk.text:
+                completion.append(chunk.text)
+                yield chunk.text
+    if cache_key is not None:
+        prompt_cache[cache_key] = json.loads("".join(completion))
@@ -0,0 +1,80 @@
+import base64
+import hashlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from cachetools import TTLCache
+
+from app.core.metrics import count_cache_lookup
+from app.settings import get_settings
+
+if TYPE_CHECKING:
+    from google.genai import types
+
+_settings = get_settings()
+
+
+@dataclass(frozen=True)
+class ImageInput:
+    """A reference image as sent to the models, identified by the SHA-256 of `data`."""
+    data: bytes
+    mime_type: str
+    sha256: str
+
+    @classmethod
+    def from_bytes(cls, data: bytes, mime_type: str) -> "ImageInput":
+        return cls(data, mime_type, hashlib.sha256(data).hexdigest())
+
+
+@dataclass(frozen=True)
+class PromptRequest:
+    """Provider-neutral prompt request: system instruction, user text and an optional image."""
+    system_instruction: str
+    text: str
+    image: ImageInput | None = None
+
+
+# Base64 data URLs of recent reference images, so the repeated /update-prompt/
+# calls of a session encode their image once. Sized in bytes: a raw 20 MB upload
+# that could not be preprocessed would be a 27 MB entry, so those are not cached.
+data_url_cache = TTLCache(maxsize=_settings.PROMPT_IMAGE_CACHE_MAX_BYTES, ttl=_settings.PROMPT_IMAGE_CACHE_TTL,
+                          getsizeof=len)
+
+
+def encode_data_url(image: ImageInput) -> str:
+    key = (image.sha256, image.mime_type)
+    data_url = data_url_cache.get(key)
+    count_cache_lookup("image_data_url", data_url is not None)
+    if data_url is None:
+        # Encoding briefly holds two copies of the base64 text (bytes, then str), so a
+        # raw upload is expensive on every call; preprocessed images are small and cached.
+        encoded = base64.b64encode(image.data).decode("ascii")
+        data_url = f"data:{image.mime_type};base64,{encoded}"
+        if len(data_url) <= _settings.PROMPT_IMAGE_CACHE_MAX_ENTRY_BYTES:
+            data_url_cache[key] = data_url
+    return data_url
+
+
+def openai_messages(request: PromptRequest) -> list[dict]:
+    system = {"role": "system", "content": request.system_instruction}
+    if request.image is None:
+        return [system, {"role": "user", "content": request.text}]
+    return [
+        system,
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": request.text},
+                {"type": "image_url", "image_url": {"url": encode_data_url(request.image)}},
+            ],
+        },
+    ]
+
+
+def gemini_contents(request: PromptRequest) -> list["types.Content"]:
+    from google.genai import types
+
+    # Gemini takes the raw bytes; the SDK encodes them when it serializes the request.
+    parts = [types.Part.from_text(text=request.text)]
+    if request.image is not None:
+        parts.append(types.Part.from_bytes(data=request.image.data, mime_type=request.image.mime_type))
+    return [types.Content(role="user", parts=parts)]
@@ -0,0 +1,69 @@
+import json
+import re
+
+_FIELD_START_RE = re.compile(r'"prompt"\s*:\s*"')
+_SIMPLE_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class PromptExtractor:
+    """
+    Incrementally extracts the string value of the "prompt" field from a JSON
+    completion that arrives in arbitrary chunks, e.g. '{"pro' 'mpt": "A qu' 'iet'.
+
+    `feed` returns the newly decoded part of the prompt (possibly empty). Escape
+    sequences split across chunks are held back until they are complete.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._in_value = False
+        self.done = False
+        self.text = ""
+
+    def feed(self, chunk: str) -> str:
+        if self.done:
+            return ""
+        self._buffer += chunk
+        if not self._in_value:
+            match = _FIELD_START_RE.search(self._buffer)
+            if match is None:
+                return ""
+            self._buffer = self._buffer[match.end():]
+            self._in_value = True
+
+        decoded, i, buffer = [], 0, self._buffer
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self.done = True
+                i += 1
+                break
+            if char != "\\":
+                decoded.append(char)
+                i += 1
+                continue
+            if i + 1 >= len(buffer):
+                break
+            escape = buffer[i + 1]
+            if escape != "u":
+                decoded.append(_SIMPLE_ESCAPES.get(escape, escape))
+                i += 2
+                continue
+            # \uXXXX, or a \uXXXX\uXXXX surrogate pair.
+            length = 12 if 0xD800 <= _hex_or(buffer[i + 2:i + 6], 0) <= 0xDBFF else 6
+            if i + length > len(buffer):
+                break
+            decoded.append(json.loads(f'"{buffer[i:i + length]}"'))
+            i += length
+
+        self._buffer = buffer[i:]
+        text = "".join(decoded)
+        self.text += text
+        return text
+
+
+def _hex_or(digits: str, default: int) -> int:
+    try:
+        return int(digits, 16) if len(digits) == 4 else default
+    except ValueError:
+        return default
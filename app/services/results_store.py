@@ -0,0 +1,113 @@
+import asyncio
+import fcntl
+import json
+import os
+import threading
+from loguru import logger
+
+from app.core.metrics import service_stats
+from app.settings import get_settings
+
+
+class ResultsStore:
+    """
+    Append-only JSON-Lines store for finished generation responses.
+
+    Keeps an in-memory index of id -> byte offset, so appends and lookups are
+    O(1) regardless of history size. Writes take an exclusive file lock and
+    first index any lines appended by other workers, so duplicates are skipped
+    across gunicorn workers too.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._index: dict[str, int] = {}
+        self._indexed_size = 0
+        self._lock = threading.Lock()
+
+    async def load(self, legacy_path: str | None = None) -> None:
+        """Builds the id index from disk. Called once at startup."""
+        await asyncio.to_thread(self._load_sync, legacy_path)
+
+    async def append(self, data: dict) -> bool:
+        """Stores a response unless its id is already present. Returns True if written."""
+        return await asyncio.to_thread(self._append_sync, data)
+
+    async def get(self, image_id: str) -> dict | None:
+        """Returns the stored response for `image_id`, or None."""
+        return await asyncio.to_thread(self._get_sync, image_id)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _load_sync(self, legacy_path: str | None) -> None:
+        with self._lock:
+            self._index.clear()
+            self._indexed_size = 0
+            if os.path.exists(self.path):
+                with open(self.path, "rb") as file:
+                    self._refresh(file)
+        if legacy_path and os.path.exists(legacy_path) and not self._index:
+            self._migrate(legacy_path)
+        logger.info(f"Results store loaded {len(self._index)} responses from {self.path}")
+
+    def _migrate(self, legacy_path: str) -> None:
+        """Imports responses from the old single-document JSON file."""
+        with open(legacy_path, "r", encoding="utf-8") as file:
+            legacy = json.load(file)
+        for item in legacy:
+            self._append_sync(item)
+        logger.info(f"Migrated {len(legacy)} responses from {legacy_path} to {self.path}")
+
+    def _refresh(self, file) -> None:
+        """Indexes complete lines past the last indexed offset. Caller holds the lock."""
+        file.seek(self._indexed_size)
+        offset = self._indexed_size
+        for line in file:
+            if not line.endswith(b"\n"):
+                break  # partial line from an interrupted write
+            try:
+                self._index.setdefault(json.loads(line)["id"], offset)
+            except (ValueError, KeyError):
+                logger.warning(f"Skipping malformed line at offset {offset} in {self.path}")
+            offset += len(line)
+        self._indexed_size = offset
+
+    def _append_sync(self, data: dict) -> bool:
+        line = (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock, open(self.path, "a+b") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                self._refresh(file)
+                if data["id"] in self._index:
+                    return False
+                end = file.seek(0, os.SEEK_END)
+                if end != self._indexed_size:
+                    # Terminate a partial line left by a crashed writer.
+                    file.write(b"\n")
+                    end += 1
+                file.write(line)
+                file.flush()
+                self._index[data["id"]] = end
+                self._indexed_size = end + len(line)
+                return True
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+    def _get_sync(self, image_id: str) -> dict | None:
+        if not os.path.exists(self.path):
+            return None
+        with self._lock, open(self.path, "rb") as file:
+            if image_id not in self._index:
+                self._refresh(file)
+            offset = self._index.get(image_id)
+            if offset is None:
+                return None
+            file.seek(offset)
+            return json.loads(file.readline())
+
+
+_settings = get_settings()
+results_store = ResultsStore(_settings.RESULTS_STORE_PATH)
+LEGACY_RESULTS_PATH = _settings.LEGACY_RESULTS_PATH
+service_stats.register("results_store", lambda: {"responses": len(results_store)})
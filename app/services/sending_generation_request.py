@@ -1,13 +1,12 @@
-import os
 import httpx
-import traceback
 from loguru import logger
-from dotenv import load_dotenv
-
-load_dotenv()
+from app.core.clients import clients
+from app.core.logging import redact_headers, sampled
+from app.core.metrics import upstream
+from app.settings import APISettings, get_settings
 
 API_HOST = "cl.imagineapi.dev"
-API_KEY = os.getenv("IMAGINE_DEV_API_KEY")
+API_KEY = get_settings().IMAGINE_DEV_API_KEY
 
 if not API_KEY:
     logger.warning("⚠️ IMAGINE_DEV_API_KEY is not set. API requests will fail!")
@@ -15,14 +14,46 @@ if not API_KEY:
 API_AUTH = f"Bearer {API_KEY}" if API_KEY else ""
 BASE_URL = f"https://{API_HOST}"
 
-logger.add(
-    "logs.log",
-    level="DEBUG",
-    backtrace=True,
-    diagnose=True,
-    rotation="10 MB",
-    retention="10 days",
-)
+# Every job is polled every few seconds; its success lines are sampled.
+_status_log = sampled("imagine_status")
+
+
+def create_http_client(settings: APISettings | None = None) -> httpx.AsyncClient:
+    """
+    Builds the pooled client used for all Imagine API calls, so submits and
+    status polls reuse warm keep-alive connections instead of a new TCP+TLS
+    handshake each time.
+    """
+    settings = settings or get_settings()
+    limits = httpx.Limits(
+        max_connections=settings.IMAGINE_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.IMAGINE_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.IMAGINE_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        settings.IMAGINE_READ_TIMEOUT,
+        connect=settings.IMAGINE_CONNECT_TIMEOUT,
+    )
+    http2 = settings.IMAGINE_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("IMAGINE_HTTP2 is enabled but the 'h2' package is not installed, falling back to HTTP/1.1.")
+            http2 = False
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+
+
+async def close_http_client(client: httpx.AsyncClient) -> None:
+    await client.aclose()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Returns the worker's shared Imagine API client, creating it on first use."""
+    return clients.get("imagine")
+
+
+clients.register("imagine", create_http_client, close_http_client)
 
 
 async def send_generation_request(prompt: str) -> dict:
@@ -37,37 +68,36 @@ async def send_generation_request(prompt: str) -> dict:
     url = f"{BASE_URL}/items/images/"
     json_data = {"prompt": prompt}
 
-    logger.debug(f"POST {url} with headers={headers} and json={json_data}")
+    logger.opt(lazy=True).debug("POST {} with headers={} and json={}",
+                                lambda: url, lambda: redact_headers(headers), lambda: json_data)
 
-    async with httpx.AsyncClient() as client:
-        for attempt in range(3):
-            try:
-                logger.info(f"Attempt {attempt + 1}: Sending generation request.")
+    client = get_http_client()
+    for attempt in range(3):
+        try:
+            logger.info(f"Attempt {attempt + 1}: Sending generation request.")
+            with upstream("imagine", "generate"):
                 response = await client.post(url, headers=headers, json=json_data)
                 response.raise_for_status()
-                logger.success("✅ Image generation request successful.")
-                return response.json()
-
-            except httpx.HTTPStatusError as e:
-                logger.error(
-                    f"❌ HTTP error ({e.response.status_code}): {e.response.text}"
-                )
-                logger.error(traceback.format_exc())
-                if attempt == 2:
-                    raise
-
-            except httpx.RequestError as e:
-                # Catches network/DNS/timeout issues
-                logger.error(f"🌐 RequestError: {type(e).__name__} - {e}")
-                logger.error(traceback.format_exc())
-                if attempt == 2:
-                    raise
-
-            except Exception as e:
-                logger.error(f"💥 Unexpected error: {type(e).__name__} - {e}")
-                logger.error(traceback.format_exc())
-                if attempt == 2:
-                    raise
+            logger.success("✅ Image generation request successful.")
+            return response.json()
+
+        except httpx.HTTPStatusError as e:
+            logger.error(
+                f"❌ HTTP error ({e.response.status_code}): {e.response.text}"
+            )
+            if attempt == 2:
+                raise
+
+        except httpx.RequestError as e:
+            # Catches network/DNS/timeout issues
+            logger.error(f"🌐 RequestError: {type(e).__name__} - {e}")
+            if attempt == 2:
+                raise
+
+        except Exception as e:
+            logger.exception(f"💥 Unexpected error: {type(e).__name__} - {e}")
+            if attempt == 2:
+                raise
 
 
 async def check_generation_status(image_id: str) -> dict:
@@ -77,31 +107,29 @@ async def check_generation_status(image_id: str) -> dict:
     headers = {"Authorization": API_AUTH}
     url = f"{BASE_URL}/items/images/{image_id}"
 
-    logger.debug(f"GET {url} with headers={headers}")
+    logger.opt(lazy=True).debug("GET {} with headers={}", lambda: url, lambda: redact_headers(headers))
 
-    async with httpx.AsyncClient() as client:
-        try:
+    client = get_http_client()
+    try:
+        with upstream("imagine", "status"):
             response = await client.get(url, headers=headers)
             response.raise_for_status()
-            logger.success(f"✅ Status check successful for image_id={image_id}")
-            return response.json()
+        _status_log.success(f"✅ Status check successful for image_id={image_id}")
+        return response.json()
 
-        except httpx.HTTPStatusError as e:
-            logger.error(
-                f"❌ HTTP error during status check: {e.response.status_code} - {e.response.text}"
-            )
-            logger.error(traceback.format_exc())
-            raise
+    except httpx.HTTPStatusError as e:
+        logger.error(
+            f"❌ HTTP error during status check: {e.response.status_code} - {e.response.text}"
+        )
+        raise
 
-        except httpx.RequestError as e:
-            logger.error(f"🌐 RequestError during status check: {type(e).__name__} - {e}")
-            logger.error(traceback.format_exc())
-            raise
+    except httpx.RequestError as e:
+        logger.error(f"🌐 RequestError during status check: {type(e).__name__} - {e}")
+        raise
 
-        except Exception as e:
-            logger.error(f"💥 An error occurred during status check: {type(e).__name__} - {e}")
-            logger.error(traceback.format_exc())
-            raise
+    except Exception as e:
+        logger.exception(f"💥 An error occurred during status check: {type(e).__name__} - {e}")
+        raise
 
 if __name__ == "__main__":
     import asyncio
@@ -119,7 +147,8 @@ if __name__ == "__main__":
             else:
                 logger.warning("No image_id returned from generation response.")
         except Exception as e:
-            logger.error(f"Test failed: {e}")
-            logger.error(traceback.format_exc())
+            logger.exception(f"Test failed: {e}")
+        finally:
+            await clients.close()
 
     asyncio.run(test())
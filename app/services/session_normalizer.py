@@ -0,0 +1,100 @@
+import asyncio
+import os
+from loguru import logger
+
+from app.core.process_pool import audio_pool
+from app.services import file_io
+from app.services.audio_merge import normalize_clip
+from app.settings import get_settings
+
+NORMALIZED_DIR_NAME = "normalized"
+
+
+def normalized_path(clip_path: str) -> str:
+    """Where the normalized copy of a session clip lives."""
+    session_dir, filename = os.path.split(clip_path)
+    return os.path.join(session_dir, NORMALIZED_DIR_NAME, f"{os.path.splitext(filename)[0]}.mp3")
+
+
+class SessionNormalizer:
+    """
+    Normalizes session clips in the background as they arrive, so the final
+    merge only has to concatenate pre-encoded MP3 frames.
+
+    Normalization is best effort: if it fails or the process pool is busy,
+    the merge falls back to the original clip. At most `max_concurrency`
+    normalizations use the pool at once, and none start while foreground work
+    occupies every worker, so a burst of uploads cannot fill the pool's
+    pending budget and get uploads, merges and image requests rejected.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self._tasks: dict[str, set[asyncio.Task]] = {}
+        # Tasks holding the semaphore, i.e. normalizing rather than queued.
+        self._running: set[asyncio.Task] = set()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def schedule(self, session_id: str, clip_path: str) -> None:
+        task = asyncio.create_task(self._normalize(clip_path))
+        tasks = self._tasks.setdefault(session_id, set())
+        tasks.add(task)
+
+        def done(task: asyncio.Task) -> None:
+            tasks.discard(task)
+            # Sessions merged on another worker, or reaped, never call wait() here.
+            if not tasks and self._tasks.get(session_id) is tasks:
+                del self._tasks[session_id]
+
+        task.add_done_callback(done)
+
+    async def wait(self, session_id: str) -> None:
+        """
+        Waits for the session's normalizations already running on this worker.
+        Ones still queued, possibly behind other sessions' clips, are cancelled:
+        the merge encodes those clips itself instead of waiting for the queue.
+        """
+        tasks = self._tasks.pop(session_id, set())
+        for task in tasks:
+            if task not in self._running:
+                task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _normalize(self, clip_path: str) -> None:
+        output_path = normalized_path(clip_path)
+        try:
+            async with self._semaphore:
+                if audio_pool.pending >= audio_pool.max_workers:
+                    logger.info(f"Process pool busy, skipping background normalization of {clip_path}.")
+                    return
+                task = asyncio.current_task()
+                self._running.add(task)
+                try:
+                    await file_io.makedirs(os.path.dirname(output_path))
+                    await audio_pool.run(normalize_clip, clip_path, output_path)
+                finally:
+                    self._running.discard(task)
+        except Exception as e:
+            logger.warning(f"Background normalization skipped for {clip_path}: {e}")
+
+    async def merge_inputs(self, clip_paths: list[str]) -> tuple[list[str], bool]:
+        """
+        Returns the files to merge for `clip_paths`, preferring normalized copies,
+        and whether every clip was normalized.
+        """
+        return await asyncio.to_thread(self._merge_inputs, clip_paths)
+
+    @staticmethod
+    def _merge_inputs(clip_paths: list[str]) -> tuple[list[str], bool]:
+        inputs, prenormalized = [], True
+        for clip_path in clip_paths:
+            candidate = normalized_path(clip_path)
+            if os.path.exists(candidate):
+                inputs.append(candidate)
+            else:
+                inputs.append(clip_path)
+                prenormalized = False
+        return inputs, prenormalized
+
+
+session_normalizer = SessionNormalizer(max_concurrency=get_settings().NORMALIZE_MAX_CONCURRENCY)
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import time
+from loguru import logger
+
+from app.core.metrics import service_stats
+from app.services.session_store import SessionStore, session_store
+from app.services.transcription_cache import TranscriptionCache, transcription_cache
+from app.settings import get_settings
+
+
+class SessionReaper:
+    """
+    Periodically removes audio sessions that are never merged.
+
+    Each sweep deletes sessions idle for longer than `idle_ttl`, then, if the
+    remaining sessions still exceed `max_bytes`, evicts the least recently
+    modified ones until they fit. Expired merged-audio downloads and cached
+    transcripts are removed too. Deletion goes through the session store, off
+    the event loop.
+    """
+
+    def __init__(self, store: SessionStore, idle_ttl: float, max_bytes: int, interval: float,
+                 downloads_dir: str, download_ttl: float, transcriptions: TranscriptionCache):
+        self.store = store
+        self.transcriptions = transcriptions
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.downloads_dir = downloads_dir
+        self.download_ttl = download_ttl
+        self._task: asyncio.Task | None = None
+        self._stats = {
+            "sessions": 0,
+            "session_bytes": 0,
+            "expired": 0,
+            "evicted": 0,
+            "reclaimed_bytes": 0,
+            "downloads_removed": 0,
+            "transcripts_removed": 0,
+            "last_sweep_seconds": 0.0,
+        }
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return dict(self._stats)
+
+    async def sweep(self) -> None:
+        started = time.monotonic()
+        now = time.time()
+        sessions = sorted(await self.store.usage(), key=lambda session: session.last_modified)
+
+        expired = [session for session in sessions if now - session.last_modified > self.idle_ttl]
+        remaining = sessions[len(expired):]
+        total = sum(session.size for session in remaining)
+        evicted = []
+        while remaining and total > self.max_bytes:
+            session = remaining.pop(0)
+            total -= session.size
+            evicted.append(session)
+
+        for session in expired + evicted:
+            try:
+                await self.store.delete(session.session_id)
+            except Exception as e:
+                logger.warning(f"Could not reap session '{session.session_id}': {e}")
+                continue
+            self._stats["reclaimed_bytes"] += session.size
+        self._stats["expired"] += len(expired)
+        self._stats["evicted"] += len(evicted)
+        if evicted:
+            logger.warning(f"Session quota exceeded: evicted {len(evicted)} oldest sessions")
+
+        self._stats["downloads_removed"] += await asyncio.to_thread(self._sweep_downloads, now)
+        self._stats["transcripts_removed"] += await asyncio.to_thread(self.transcriptions.sweep_disk, now)
+        self._stats["sessions"] = len(remaining)
+        self._stats["session_bytes"] = total
+        self._stats["last_sweep_seconds"] = time.monotonic() - started
+        logger.info(f"Session reaper: {len(remaining)} sessions, {total} bytes; "
+                    f"expired {len(expired)}, evicted {len(evicted)}")
+
+    def _sweep_downloads(self, now: float) -> int:
+        if not os.path.isdir(self.downloads_dir):
+            return 0
+        removed = 0
+        for entry in os.scandir(self.downloads_dir):
+            try:
+                if entry.is_file() and now - entry.stat().st_mtime > self.download_ttl:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Session reaper sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+_settings = get_settings()
+
+session_reaper = SessionReaper(
+    session_store,
+    idle_ttl=_settings.SESSION_IDLE_TTL,
+    max_bytes=_settings.SESSION_MAX_TOTAL_BYTES,
+    interval=_settings.SESSION_REAPER_INTERVAL,
+    downloads_dir=_settings.MERGED_AUDIO_DIR,
+    download_ttl=_settings.MERGED_AUDIO_LINK_TTL,
+    transcriptions=transcription_cache,
+)
+service_stats.register("session_reaper", session_reaper.stats)
@@ -0,0 +1,534 @@
+import asyncio
+import contextlib
+import fcntl
+import functools
+import os
+import re
+import shutil
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Callable
+from loguru import logger
+
+from app.core.clients import clients
+from app.services import file_io
+from app.services.file_io import atomic_write_json, read_json
+from app.settings import APISettings, get_settings
+
+METADATA_FILENAME = "metadata.json"
+LOCK_FILENAME = ".lock"
+STAGING_SUFFIX = ".incoming"
+# Clips are stored as "<uuid4><original extension>"; anything else in a session
+# directory (metadata, locks, staged downloads, normalized copies, merge output) is not a clip.
+CLIP_NAME_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\.[A-Za-z0-9]+")
+GRIDFS_CHUNK_SIZE = 1024 * 1024
+GRIDFS_UPSERT_ATTEMPTS = 3
+
+
+class DuplicateSourceError(Exception):
+    """Raised when a source URL has already been added to a session."""
+
+
+class DuplicateClipError(DuplicateSourceError):
+    """Raised when a clip with the same content (SHA-256) is already in the session."""
+
+
+@dataclass
+class ClipEntry:
+    """
+    One clip in a session's manifest, in the order given by `seq`. `path` is
+    the clip's local path on this node and is not stored with the manifest.
+    Clips recorded before the manifest carried details only have a filename.
+    """
+    seq: int
+    filename: str
+    mime_type: str | None = None
+    sha256: str | None = None
+    duration: float | None = None
+    sample_rate: int | None = None
+    path: str = ""
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        del data["path"]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict | str, seq: int) -> "ClipEntry":
+        if isinstance(data, str):
+            return cls(seq=seq, filename=data)
+        return cls(**data)
+
+    def at(self, session_dir: str) -> "ClipEntry":
+        return replace(self, path=os.path.join(session_dir, self.filename))
+
+
+@dataclass
+class SessionUsage:
+    session_id: str
+    size: int
+    last_modified: float
+
+
+def directory_usage(path: str) -> tuple[int, float]:
+    """Total bytes under `path` and the latest mtime of it or anything in it."""
+    size, last_modified = 0, os.stat(path).st_mtime
+    for root, dirs, files in os.walk(path):
+        for name in dirs + files:
+            try:
+                stat = os.stat(os.path.join(root, name))
+            except FileNotFoundError:
+                continue
+            last_modified = max(last_modified, stat.st_mtime)
+            if name in files:
+                size += stat.st_size
+    return size, last_modified
+
+
+def local_usage(base_dir: str) -> list[SessionUsage]:
+    """Usage of every session directory under `base_dir`."""
+    if not os.path.isdir(base_dir):
+        return []
+    sessions = []
+    for entry in os.scandir(base_dir):
+        if not entry.is_dir(follow_symlinks=False):
+            continue
+        try:
+            size, last_modified = directory_usage(entry.path)
+        except FileNotFoundError:
+            continue  # deleted while scanning
+        sessions.append(SessionUsage(entry.name, size, last_modified))
+    return sessions
+
+
+def clip_filename(original_filename: str | None) -> str:
+    _, extension = os.path.splitext(original_filename or "")
+    return f"{uuid.uuid4()}{extension or '.mp3'}"
+
+
+class SessionStore(ABC):
+    """
+    Storage for audio sessions: the ordered clips of a session and the source
+    URLs they came from.
+
+    ffmpeg works on real files, so every backend exposes a local working
+    directory per session. Incoming files are staged there, and `list_clips`
+    makes sure every clip of the session is present in it before returning.
+    """
+
+    @abstractmethod
+    def working_dir(self, session_id: str) -> str:
+        """Local directory holding the session's files on this node."""
+
+    async def staging_path(self, session_id: str) -> str:
+        """Returns a unique local path to stream an incoming file to, creating the working directory."""
+        session_dir = self.working_dir(session_id)
+        await file_io.makedirs(session_dir)
+        return os.path.join(session_dir, f"{uuid.uuid4()}{STAGING_SUFFIX}")
+
+    @abstractmethod
+    async def add_clip(self, session_id: str, staged_path: str, original_filename: str, mime_type: str,
+                       sha256: str, source_url: str | None = None, duration: float | None = None,
+                       sample_rate: int | None = None) -> ClipEntry:
+        """
+        Moves a staged file into the session and appends it to the manifest.
+        Raises DuplicateSourceError if `source_url` was already added, or
+        DuplicateClipError if a clip with the same `sha256` was, and removes the
+        staged file; the checks and the insert are atomic.
+        """
+
+    @abstractmethod
+    async def source_urls(self, session_id: str) -> list[str]:
+        """URLs already added to the session."""
+
+    @abstractmethod
+    async def list_clips(self, session_id: str) -> list[ClipEntry]:
+        """The session's manifest in the order the clips were added, with local paths."""
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> None:
+        """Removes the session and all of its files."""
+
+    @abstractmethod
+    async def usage(self) -> list[SessionUsage]:
+        """Size and last modification time of every stored session."""
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalSessionStore(SessionStore):
+    """
+    Sessions in `<base_dir>/<session_id>` on the local disk.
+
+    Metadata updates take an exclusive flock on the session's lock file and are
+    written atomically (temp file + rename), so concurrent adds from several
+    workers on the same host cannot lose URLs.
+
+    The metadata also holds the session's manifest, one ClipEntry per clip in
+    the order they were added. Each worker keeps the manifests it has read in
+    memory, keyed by the metadata file's mtime and size, so listing a session costs one
+    stat instead of a directory listing and a stat per clip.
+    """
+
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+        self._manifests: dict[str, tuple[tuple[int, int], list[ClipEntry]]] = {}
+
+    def working_dir(self, session_id: str) -> str:
+        return os.path.join(self.base_dir, session_id)
+
+    async def add_clip(self, session_id: str, staged_path: str, original_filename: str, mime_type: str,
+                       sha256: str, source_url: str | None = None, duration: float | None = None,
+                       sample_rate: int | None = None) -> ClipEntry:
+        return await asyncio.to_thread(self._add_clip_sync, session_id, staged_path, original_filename,
+                                       mime_type, sha256, source_url, duration, sample_rate)
+
+    async def source_urls(self, session_id: str) -> list[str]:
+        return await asyncio.to_thread(self._source_urls_sync, session_id)
+
+    async def list_clips(self, session_id: str) -> list[ClipEntry]:
+        return await asyncio.to_thread(self._list_clips_sync, session_id)
+
+    async def delete(self, session_id: str) -> None:
+        session_dir = self.working_dir(session_id)
+        self._manifests.pop(session_id, None)
+        await asyncio.to_thread(shutil.rmtree, session_dir, ignore_errors=True)
+        logger.info(f"Cleaned up session directory: {session_dir}")
+
+    async def usage(self) -> list[SessionUsage]:
+        return await asyncio.to_thread(local_usage, self.base_dir)
+
+    @contextlib.contextmanager
+    def _locked(self, session_dir: str):
+        with open(os.path.join(session_dir, LOCK_FILENAME), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_metadata(self, session_dir: str) -> dict:
+        metadata_file = os.path.join(session_dir, METADATA_FILENAME)
+        try:
+            return read_json(metadata_file) or {"urls": []}
+        except (OSError, ValueError):
+            logger.warning(f"Could not read {metadata_file}, resetting it.")
+            return {"urls": []}
+
+    def _write_metadata(self, session_dir: str, metadata: dict) -> None:
+        atomic_write_json(os.path.join(session_dir, METADATA_FILENAME), metadata)
+
+    def _add_clip_sync(self, session_id: str, staged_path: str, original_filename: str, mime_type: str,
+                       sha256: str, source_url: str | None, duration: float | None,
+                       sample_rate: int | None) -> ClipEntry:
+        session_dir = self.working_dir(session_id)
+        os.makedirs(session_dir, exist_ok=True)
+        with self._locked(session_dir):
+            metadata = self._read_metadata(session_dir)
+            manifest = self._manifest(session_dir, metadata)
+            if source_url and source_url in metadata.get("urls", []):
+                os.remove(staged_path)
+                raise DuplicateSourceError(source_url)
+            if any(entry.sha256 == sha256 for entry in manifest):
+                os.remove(staged_path)
+                raise DuplicateClipError(sha256)
+            entry = ClipEntry(manifest[-1].seq + 1 if manifest else 0, clip_filename(original_filename),
+                              mime_type, sha256, duration, sample_rate)
+            os.replace(staged_path, os.path.join(session_dir, entry.filename))
+            manifest.append(entry)
+            metadata["clips"] = [clip.to_dict() for clip in manifest]
+            if source_url:
+                metadata.setdefault("urls", []).append(source_url)
+            self._write_metadata(session_dir, metadata)
+            self._manifests[session_id] = (self._metadata_version(session_dir), manifest)
+        return entry.at(session_dir)
+
+    def _source_urls_sync(self, session_id: str) -> list[str]:
+        return self._read_metadata(self.working_dir(session_id)).get("urls", [])
+
+    def _list_clips_sync(self, session_id: str) -> list[ClipEntry]:
+        session_dir = self.working_dir(session_id)
+        version = self._metadata_version(session_dir)
+        cached = self._manifests.get(session_id)
+        if cached is not None and cached[0] == version:
+            manifest = cached[1]
+        elif version is not None and "clips" in (metadata := self._read_metadata(session_dir)):
+            manifest = self._manifest(session_dir, metadata)
+            self._manifests[session_id] = (version, manifest)
+        elif os.path.isdir(session_dir):
+            manifest = self._manifest(session_dir, {})
+        else:
+            self._manifests.pop(session_id, None)
+            return []
+        return [entry.at(session_dir) for entry in manifest]
+
+    def _manifest(self, session_dir: str, metadata: dict) -> list[ClipEntry]:
+        clips = metadata.get("clips")
+        if clips is None:
+            # Sessions created before the manifest was recorded.
+            clips = self._scan_clips(session_dir)
+        return [ClipEntry.from_dict(clip, seq) for seq, clip in enumerate(clips)]
+
+    @staticmethod
+    def _scan_clips(session_dir: str) -> list[str]:
+        clips = [f for f in os.listdir(session_dir) if CLIP_NAME_RE.fullmatch(f) and not f.endswith(STAGING_SUFFIX)]
+        return sorted(clips, key=lambda f: os.path.getctime(os.path.join(session_dir, f)))
+
+    @staticmethod
+    def _metadata_version(session_dir: str) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(os.path.join(session_dir, METADATA_FILENAME))
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
+
+class SharedDirSessionStore(LocalSessionStore):
+    """
+    Sessions in a directory mounted on every node (e.g. NFS or EFS).
+
+    flock is not reliably honoured across NFS clients, so metadata updates are
+    serialized with a lock file created with O_EXCL instead. A lock older than
+    `lock_timeout` is treated as left behind by a crashed writer and broken.
+    """
+
+    def __init__(self, base_dir: str, lock_timeout: float = 30.0, poll_interval: float = 0.05):
+        super().__init__(base_dir)
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+
+    @contextlib.contextmanager
+    def _locked(self, session_dir: str):
+        lock_path = os.path.join(session_dir, LOCK_FILENAME)
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                with contextlib.suppress(FileNotFoundError):
+                    if time.time() - os.path.getmtime(lock_path) > self.lock_timeout:
+                        logger.warning(f"Breaking stale session lock {lock_path}")
+                        os.remove(lock_path)
+                        continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out waiting for session lock {lock_path}")
+                time.sleep(self.poll_interval)
+        try:
+            os.close(fd)
+            yield
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(lock_path)
+
+
+@dataclass
+class GridFSHandles:
+    """The session documents, the bucket's files collection and the GridFS bucket."""
+    sessions: Any
+    files: Any
+    bucket: Any
+
+
+def create_mongodb_client(uri: str):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    return AsyncIOMotorClient(uri)
+
+
+async def close_mongodb_client(client) -> None:
+    client.close()
+
+
+def create_gridfs_handles(database: str, bucket_name: str) -> GridFSHandles:
+    from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+
+    db = clients.get("mongodb")[database]
+    return GridFSHandles(db[bucket_name], db[f"{bucket_name}.files"],
+                         AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name))
+
+
+async def close_gridfs_handles(handles: GridFSHandles) -> None:
+    # The handles share the "mongodb" client, which the registry closes after them.
+    pass
+
+
+class GridFSSessionStore(SessionStore):
+    """
+    Sessions in MongoDB: clips in a GridFS bucket, with their manifest entry in
+    the file metadata, and a document per session holding its source URLs,
+    clip hashes and next sequence number. Any node can add clips to or merge a session.
+
+    URLs and hashes are recorded with a single conditional upsert that also
+    assigns the sequence number, so duplicate checks are atomic across nodes.
+    Clips are cached under `cache_dir` on the node that handled them, and
+    downloaded from GridFS when another node merges.
+    """
+
+    def __init__(self, cache_dir: str, handles: Callable[[], GridFSHandles]):
+        self.cache_dir = cache_dir
+        self._handles = handles
+
+    @classmethod
+    def from_uri(cls, uri: str, database: str, cache_dir: str,
+                 bucket_name: str = "audio_sessions") -> "GridFSSessionStore":
+        """
+        Registers the Motor client and the bucket's handles with the client
+        registry, so each worker connects after it has forked and `clients.close()`
+        disconnects it. Nothing connects until the lifespan or first use.
+        """
+        clients.register("mongodb", functools.partial(create_mongodb_client, uri), close_mongodb_client)
+        clients.register("gridfs", functools.partial(create_gridfs_handles, database, bucket_name),
+                         close_gridfs_handles)
+        return cls(cache_dir, functools.partial(clients.get, "gridfs"))
+
+    @property
+    def _sessions(self):
+        return self._handles().sessions
+
+    @property
+    def _files(self):
+        return self._handles().files
+
+    @property
+    def _bucket(self):
+        return self._handles().bucket
+
+    def working_dir(self, session_id: str) -> str:
+        return os.path.join(self.cache_dir, session_id)
+
+    async def add_clip(self, session_id: str, staged_path: str, original_filename: str, mime_type: str,
+                       sha256: str, source_url: str | None = None, duration: float | None = None,
+                       sample_rate: int | None = None) -> ClipEntry:
+        from pymongo import ReturnDocument
+        from pymongo.errors import DuplicateKeyError
+
+        conditions = {"_id": session_id, "hashes": {"$ne": sha256}}
+        recorded = {"hashes": sha256}
+        if source_url:
+            conditions["urls"] = {"$ne": source_url}
+            recorded["urls"] = source_url
+        for attempt in range(GRIDFS_UPSERT_ATTEMPTS):
+            try:
+                session = await self._sessions.find_one_and_update(
+                    conditions,
+                    {"$push": recorded, "$inc": {"next_seq": 1}},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                )
+                break
+            except DuplicateKeyError:
+                # Either the session already has this URL or clip, so the filter
+                # matched nothing, or another node created the session between our
+                # lookup and insert. MongoDB does not retry upserts with $ne filters.
+                document = await self._sessions.find_one({"_id": session_id}) or {}
+                if sha256 in document.get("hashes", []):
+                    await file_io.remove(staged_path)
+                    raise DuplicateClipError(sha256)
+                if source_url and source_url in document.get("urls", []):
+                    await file_io.remove(staged_path)
+                    raise DuplicateSourceError(source_url)
+                logger.debug(f"Session '{session_id}' was created concurrently, retrying (attempt {attempt + 1}).")
+        else:
+            await file_io.remove(staged_path)
+            raise RuntimeError(f"Could not record clip in session '{session_id}' after {GRIDFS_UPSERT_ATTEMPTS} attempts")
+
+        entry = ClipEntry(session["next_seq"] - 1, clip_filename(original_filename),
+                          mime_type, sha256, duration, sample_rate).at(self.working_dir(session_id))
+        try:
+            await asyncio.to_thread(os.replace, staged_path, entry.path)
+            await self._upload(session_id, entry, original_filename)
+        except BaseException:
+            await self._sessions.update_one({"_id": session_id}, {"$pull": recorded})
+            raise
+        return entry
+
+    async def source_urls(self, session_id: str) -> list[str]:
+        document = await self._sessions.find_one({"_id": session_id})
+        return document.get("urls", []) if document else []
+
+    async def list_clips(self, session_id: str) -> list[ClipEntry]:
+        session_dir = self.working_dir(session_id)
+        clips = []
+        cursor = self._bucket.find({"metadata.session_id": session_id}).sort(
+            [("metadata.clip.seq", 1), ("uploadDate", 1)])
+        async for grid_out in cursor:
+            entry = ClipEntry.from_dict(grid_out.metadata.get("clip") or grid_out.filename, len(clips))
+            entry = entry.at(session_dir)
+            if await file_io.stat(entry.path) is None:
+                await self._download(grid_out._id, entry.path)
+            clips.append(entry)
+        return clips
+
+    async def delete(self, session_id: str) -> None:
+        async for grid_out in self._bucket.find({"metadata.session_id": session_id}):
+            await self._bucket.delete(grid_out._id)
+        await self._sessions.delete_one({"_id": session_id})
+        await asyncio.to_thread(shutil.rmtree, self.working_dir(session_id), ignore_errors=True)
+        logger.info(f"Deleted session '{session_id}' from GridFS")
+
+    async def usage(self) -> list[SessionUsage]:
+        """
+        Usage of the sessions stored in GridFS. Local cache directories of sessions
+        that are gone from GridFS are reported too, so they get reaped as well.
+        """
+        sessions = {}
+        pipeline = [{"$group": {
+            "_id": "$metadata.session_id",
+            "size": {"$sum": "$length"},
+            "last_modified": {"$max": "$uploadDate"},
+        }}]
+        async for group in self._files.aggregate(pipeline):
+            sessions[group["_id"]] = SessionUsage(group["_id"], group["size"], group["last_modified"].timestamp())
+        for cached in await asyncio.to_thread(local_usage, self.cache_dir):
+            sessions.setdefault(cached.session_id, cached)
+        return list(sessions.values())
+
+    async def _upload(self, session_id: str, entry: ClipEntry, original_filename: str) -> None:
+        grid_in = self._bucket.open_upload_stream(
+            entry.filename,
+            metadata={"session_id": session_id, "original_filename": original_filename, "clip": entry.to_dict()},
+        )
+        try:
+            f = await asyncio.to_thread(open, entry.path, "rb")
+            try:
+                while chunk := await asyncio.to_thread(f.read, GRIDFS_CHUNK_SIZE):
+                    await grid_in.write(chunk)
+            finally:
+                await asyncio.to_thread(f.close)
+        except BaseException:
+            await grid_in.abort()
+            raise
+        await grid_in.close()
+
+    async def _download(self, file_id, file_path: str) -> None:
+        await file_io.makedirs(os.path.dirname(file_path))
+        part_path = f"{file_path}.part"
+        grid_out = await self._bucket.open_download_stream(file_id)
+        f = await asyncio.to_thread(open, part_path, "wb")
+        try:
+            while chunk := await grid_out.read(GRIDFS_CHUNK_SIZE):
+                await asyncio.to_thread(f.write, chunk)
+        finally:
+            await asyncio.to_thread(f.close)
+        await asyncio.to_thread(os.replace, part_path, file_path)
+
+
+def create_session_store(settings: APISettings) -> SessionStore:
+    backend = settings.SESSION_STORE_BACKEND.lower()
+    if backend == "local":
+        return LocalSessionStore(settings.SESSION_BASE_DIR)
+    if backend == "shared":
+        return SharedDirSessionStore(settings.SESSION_SHARED_DIR, lock_timeout=settings.SESSION_LOCK_TIMEOUT)
+    if backend == "gridfs":
+        return GridFSSessionStore.from_uri(settings.MONGODB_URI, settings.MONGODB_DATABASE, settings.SESSION_BASE_DIR)
+    raise ValueError(f"Unknown SESSION_STORE_BACKEND '{settings.SESSION_STORE_BACKEND}'")
+
+
+_settings = get_settings()
+
+session_store = create_session_store(_settings)
@@ -0,0 +1,92 @@
+import asyncio
+from typing import Awaitable, Callable
+from cachetools import LRUCache, TTLCache
+from loguru import logger
+
+from app.core.metrics import service_stats
+from app.services.sending_generation_request import check_generation_status
+from app.settings import get_settings
+from app.services.results_store import results_store
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class StatusCache:
+    """
+    In-process cache for Imagine API status lookups, keyed by image id.
+
+    - In-progress responses are served from a short TTL cache.
+    - Terminal responses (completed/failed) are kept until evicted by LRU and never re-fetched.
+    - Concurrent lookups for the same id share a single upstream call.
+    """
+
+    def __init__(self, fetch: Callable[[str], Awaitable[dict]], ttl: float, maxsize: int):
+        self._fetch = fetch
+        self._pending = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._terminal = LRUCache(maxsize=maxsize)
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get(self, image_id: str) -> dict:
+        for cache in (self._terminal, self._pending):
+            response = cache.get(image_id)
+            if response is not None:
+                self.hits += 1
+                return response
+
+        task = self._inflight.get(image_id)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(image_id))
+            self._inflight[image_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(image_id, None))
+        # Shield so one cancelled client does not cancel the lookup for the others.
+        return await asyncio.shield(task)
+
+    async def _load(self, image_id: str) -> dict:
+        response = await self._fetch(image_id)
+        if response['data']['status'] in TERMINAL_STATUSES:
+            self._terminal[image_id] = response
+            self._pending.pop(image_id, None)
+        else:
+            self._pending[image_id] = response
+        return response
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "size": len(self._pending) + len(self._terminal),
+            "inflight": len(self._inflight),
+        }
+
+
+async def fetch_and_record_status(image_id: str) -> dict:
+    """
+    Fetches the status, answering finished generations from the results store.
+    Terminal responses fetched upstream are recorded once instead of on every poll.
+    """
+    stored = await results_store.get(image_id)
+    if stored is not None:
+        return {"data": stored}
+    response = await check_generation_status(image_id)
+    if response['data']['status'] in TERMINAL_STATUSES:
+        await results_store.append(response['data'])
+        logger.info(f"Generation {image_id} reached terminal status '{response['data']['status']}'.")
+    return response
+
+
+_settings = get_settings()
+status_cache = StatusCache(
+    fetch=fetch_and_record_status,
+    ttl=_settings.STATUS_CACHE_TTL,
+    maxsize=_settings.STATUS_CACHE_MAX_SIZE,
+)
+service_stats.register("status_cache", status_cache.stats)
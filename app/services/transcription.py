@@ -1,40 +1,122 @@
-import os
-from openai import AsyncOpenAI
-from dotenv import load_dotenv
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator
+from fastapi import HTTPException
 from loguru import logger
 
-load_dotenv(override=True)
+from app.core.clients import clients
+from app.core.metrics import upstream
+from app.core.process_pool import audio_pool
+from app.services import file_io
+from app.services.audio_chunking import split_audio_at_silence, audio_duration
+from app.services.transcription_cache import transcription_cache, hash_file
+from app.settings import get_settings
+
+TRANSCRIPTION_MODEL = "whisper-1"
+TRANSCRIPTION_LANGUAGE = "en"
+
+settings = get_settings()
+# Shared across all requests, so one long session cannot monopolise the Whisper quota.
+_transcription_semaphore = asyncio.Semaphore(settings.TRANSCRIPTION_MAX_CONCURRENCY)
+
+
+async def _transcribe_file(file_path: str) -> str:
+    """Sends one file to Whisper. Raises on failure."""
+    async with _transcription_semaphore:
+        with upstream("whisper", "transcription"):
+            # Given a path, the SDK reads the file in a worker thread; an open file
+            # object would be read on the event loop while the request body is sent.
+            return await clients.get("openai").audio.transcriptions.create(
+                model=TRANSCRIPTION_MODEL,
+                file=Path(file_path),
+                response_format="text",
+                language=TRANSCRIPTION_LANGUAGE
+            )
+
+
+async def _needs_chunking(file_path: str) -> bool:
+    """
+    Whether the file is too large or too long for a single Whisper request.
+    The duration comes from ffprobe, a short subprocess that is run from a
+    thread rather than the process pool, so short files never wait for or get
+    rejected by the pool. If the probe fails the file is sent whole.
+    """
+    stat = await file_io.stat(file_path)
+    if stat is not None and stat.st_size > settings.TRANSCRIPTION_CHUNK_MAX_BYTES:
+        return True
+    try:
+        duration = await asyncio.to_thread(audio_duration, file_path)
+    except Exception as e:
+        logger.warning(f"Could not probe the duration of {file_path}, transcribing it whole: {e}")
+        return False
+    return duration > 2 * settings.TRANSCRIPTION_CHUNK_SECONDS
+
+
+async def iter_transcription_chunks(file_path: str) -> AsyncIterator[tuple[int, str]]:
+    """
+    Splits the audio at silences into size-capped chunks, transcribes them
+    concurrently and yields (index, text) in order as soon as each chunk and
+    all chunks before it are done.
+    """
+    async with file_io.temporary_directory() as chunk_dir:
+        chunks = await audio_pool.run(
+            split_audio_at_silence, file_path, chunk_dir,
+            settings.TRANSCRIPTION_CHUNK_SECONDS, settings.TRANSCRIPTION_CHUNK_MAX_BYTES,
+        )
+        logger.info(f"Transcribing {file_path} in {len(chunks)} chunks...")
+        tasks = [asyncio.create_task(_transcribe_file(chunk)) for chunk in chunks]
+        try:
+            for index, task in enumerate(tasks):
+                yield index, (await task).strip()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def transcribe_audio_chunked(file_path: str) -> str:
+    """Transcribes long audio chunk by chunk in parallel and stitches the text in order."""
+    texts = [text async for _, text in iter_transcription_chunks(file_path)]
+    return " ".join(text for text in texts if text)
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 async def transcribe_audio(file_path: str) -> str:
     """
     Transcribes an audio file using OpenAI's Whisper model asynchronously.
+    Long or large files are split at silences and transcribed in parallel chunks.
+    Results are cached by the SHA-256 of the audio, so repeated audio is not re-transcribed.
     
     Args:
         file_path: The local path to the audio file.
         
     Returns:
         The transcribed text as a string, or an error message if transcription fails.
+        HTTPExceptions, e.g. a 503 from a saturated process pool, are re-raised
+        so the routes can keep the session for a retry.
     """
-    if not os.path.exists(file_path):
+    if await file_io.stat(file_path) is None:
         logger.error(f"Transcription failed: File not found at {file_path}")
         return "Error: Audio file not found for transcription."
 
     try:
-        with open(file_path, "rb") as audio_file:
-            logger.info(f"Starting transcription for {file_path}...")
-            transcription_response = await client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                response_format="text",
-                language="en"
-            )
-            
+        content_hash = await asyncio.to_thread(hash_file, file_path)
+        cache_key = transcription_cache.make_key(content_hash, TRANSCRIPTION_MODEL, TRANSCRIPTION_LANGUAGE)
+        cached_text = await transcription_cache.get(cache_key)
+        if cached_text is not None:
+            logger.info(f"Transcription cache hit for {file_path}")
+            return cached_text
+
+        logger.info(f"Starting transcription for {file_path}...")
+        if await _needs_chunking(file_path):
+            transcription_text = await transcribe_audio_chunked(file_path)
+        else:
             # For response_format="text", the result is a plain string
-            transcription_text = transcription_response
-            logger.success(f"Transcription successful for {file_path}")
-            return transcription_text
+            transcription_text = await _transcribe_file(file_path)
+        await transcription_cache.set(cache_key, transcription_text)
+        logger.success(f"Transcription successful for {file_path}")
+        return transcription_text
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"An error occurred during transcription: {e}")
-        return f"Error during transcription: {e}"
\ No newline at end of file
+        return f"Error during transcription: {e}"
@@ -0,0 +1,126 @@
+import asyncio
+import hashlib
+import os
+import time
+from cachetools import TTLCache
+
+from app.core.metrics import service_stats
+from app.services.file_io import atomic_write
+from app.settings import get_settings
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(file_path: str) -> str:
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """
+    Content-addressed transcription cache: an in-memory LRU tier in front of an
+    on-disk tier (one text file per key) that survives restarts and is shared
+    by all workers on the host.
+
+    Transcripts are kept for at most `max_age` seconds from when they were
+    written, in both tiers. `sweep_disk`, run by the session reaper, deletes
+    expired files and then the oldest ones while the disk tier exceeds `max_bytes`.
+    """
+
+    def __init__(self, directory: str, maxsize: int, max_age: float, max_bytes: int):
+        self.directory = directory
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._memory = TTLCache(maxsize=maxsize, ttl=max_age)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(content_hash: str, model: str, language: str) -> str:
+        return hashlib.sha256(f"{content_hash}:{model}:{language}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.txt")
+
+    async def get(self, key: str) -> str | None:
+        text = self._memory.get(key)
+        if text is not None:
+            self.memory_hits += 1
+            return text
+        text = await asyncio.to_thread(self._read, key)
+        if text is not None:
+            self.disk_hits += 1
+            self._memory[key] = text
+            return text
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, text: str) -> None:
+        self._memory[key] = text
+        await asyncio.to_thread(self._write, key, text)
+
+    def _read(self, key: str) -> str | None:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as file:
+                # Expired but not swept yet.
+                if time.time() - os.fstat(file.fileno()).st_mtime > self.max_age:
+                    return None
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, text: str) -> None:
+        atomic_write(self._path(key), text)
+
+    def sweep_disk(self, now: float) -> int:
+        """Deletes expired transcripts, then the oldest while over `max_bytes`. Returns how many were removed."""
+        if not os.path.isdir(self.directory):
+            return 0
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if now - mtime <= self.max_age and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_size": len(self._memory),
+        }
+
+
+_settings = get_settings()
+transcription_cache = TranscriptionCache(
+    directory=_settings.TRANSCRIPTION_CACHE_DIR,
+    maxsize=_settings.TRANSCRIPTION_CACHE_MAX_ENTRIES,
+    max_age=_settings.TRANSCRIPTION_CACHE_MAX_AGE,
+    max_bytes=_settings.TRANSCRIPTION_CACHE_MAX_BYTES,
+)
+service_stats.register("transcription_cache", transcription_cache.stats)
@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import AsyncIterator
+from fastapi import HTTPException, UploadFile
+
+from app.services import file_io
+from app.services.mime import detect_mime_type, MIME_SNIFF_BYTES
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class IngestedUpload:
+    mime_type: str
+    size: int
+    sha256: str
+    path: str | None = None
+    data: bytes | None = None
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"File too large. Maximum size is {max_bytes // (1024 * 1024)} MB.")
+
+
+async def ingest_stream(
+    chunks: AsyncIterator[bytes],
+    allowed_mime_types: list[str],
+    max_bytes: int,
+    kind: str,
+    dest_path: str | None = None,
+) -> IngestedUpload:
+    """
+    Consumes a stream of byte chunks: sniffs the MIME type from the leading bytes
+    only, enforces `max_bytes` as soon as it is exceeded and hashes while reading.
+
+    With `dest_path` the chunks are streamed to that file (written under a
+    temporary name and renamed into place), so memory stays constant regardless
+    of file size. Without it the bytes are returned in `data`.
+    """
+    head = b""
+    async for chunk in chunks:
+        head += chunk
+        if len(head) >= MIME_SNIFF_BYTES:
+            break
+    mime_type = await detect_mime_type(head)
+    if mime_type not in allowed_mime_types:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid {kind} file type. Allowed types are: {', '.join(allowed_mime_types)}. Detected: {mime_type}"
+        )
+
+    digest = hashlib.sha256()
+    size = 0
+    parts = []
+    part_path = f"{dest_path}.part" if dest_path else None
+    out = await asyncio.to_thread(open, part_path, "wb") if part_path else None
+    try:
+        chunk = head
+        while chunk:
+            size += len(chunk)
+            if size > max_bytes:
+                raise _too_large(max_bytes)
+            digest.update(chunk)
+            if out is not None:
+                await asyncio.to_thread(out.write, chunk)
+            else:
+                parts.append(chunk)
+            chunk = await anext(chunks, b"")
+        if out is not None:
+            await asyncio.to_thread(out.close)
+            await asyncio.to_thread(os.replace, part_path, dest_path)
+    except BaseException:
+        if out is not None:
+            out.close()
+            await file_io.remove(part_path)
+        raise
+
+    return IngestedUpload(
+        mime_type=mime_type,
+        size=size,
+        sha256=digest.hexdigest(),
+        path=dest_path,
+        data=None if dest_path else b"".join(parts),
+    )
+
+
+async def _iter_upload(upload: UploadFile) -> AsyncIterator[bytes]:
+    while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
+
+
+async def ingest_upload(
+    upload: UploadFile,
+    allowed_mime_types: list[str],
+    max_bytes: int,
+    kind: str,
+    dest_path: str | None = None,
+) -> IngestedUpload:
+    """Streams an UploadFile through `ingest_stream`, rejecting it up front if its size is known to be too large."""
+    if upload.size is not None and upload.size > max_bytes:
+        raise _too_large(max_bytes)
+    return await ingest_stream(_iter_upload(upload), allowed_mime_types, max_bytes, kind, dest_path)
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from datetime import timezone
 
@@ -8,6 +9,138 @@ class APISettings(BaseSettings):
     API_PREFIX: str = ""
     IS_DEBUG: bool=True
 
+    # Provider credentials, read from the environment or the .env files.
+    OPENAI_API_KEY: str | None = None
+    GEMINI_API_KEY: str | None = None
+    IMAGINE_DEV_API_KEY: str | None = None
+
+    # Logging: level, rotated file sink (empty to disable), JSON lines output, and whether
+    # records are written from a background thread. Sampled lines keep 1 in LOG_SAMPLE_EVERY.
+    LOG_LEVEL: str = "INFO"
+    LOG_FILE: str = "logs.log"
+    LOG_ROTATION: str = "10 MB"
+    LOG_RETENTION: str = "10 days"
+    LOG_JSON: bool = False
+    LOG_ENQUEUE: bool = True
+    LOG_SAMPLE_EVERY: int = 20
+
+    # Upper bound on concurrent in-flight calls per LLM provider.
+    OPENAI_MAX_CONCURRENCY: int = 32
+    GEMINI_MAX_CONCURRENCY: int = 32
+
+    # Prompt provider router: providers to route between, hedging, and health tracking.
+    # A hedge fires after the first provider's p95 latency (at least LLM_HEDGE_MIN_DELAY seconds).
+    LLM_PROVIDERS: list[str] = ["openai", "gemini"]
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_MIN_DELAY: float = 0.5
+    LLM_HEDGE_DEFAULT_DELAY: float = 2.0
+    LLM_LATENCY_WINDOW: int = 100
+    LLM_MAX_ERROR_RATE: float = 0.5
+    LLM_MIN_SAMPLES: int = 5
+    LLM_UNHEALTHY_COOLDOWN: float = 30.0
+
+    # Opt-in cache of generated prompts keyed on normalized inputs.
+    PROMPT_CACHE_ENABLED: bool = False
+    PROMPT_CACHE_TTL: float = 3600.0
+    PROMPT_CACHE_MAX_SIZE: int = 1024
+
+    # Shared HTTP client for the Imagine API.
+    IMAGINE_MAX_CONNECTIONS: int = 100
+    IMAGINE_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    IMAGINE_KEEPALIVE_EXPIRY: float = 30.0
+    IMAGINE_CONNECT_TIMEOUT: float = 5.0
+    IMAGINE_READ_TIMEOUT: float = 30.0
+    IMAGINE_HTTP2: bool = False
+
+    # /check-status cache: seconds to reuse an in-progress response, and max tracked ids.
+    STATUS_CACHE_TTL: float = 2.0
+    STATUS_CACHE_MAX_SIZE: int = 10_000
+
+    # Background job tracker: per-job poll interval bounds (seconds) and limits.
+    JOB_POLL_MIN_INTERVAL: float = 2.0
+    JOB_POLL_MAX_INTERVAL: float = 30.0
+    JOB_POLL_BACKOFF: float = 1.5
+    JOB_POLL_BATCH_SIZE: int = 50
+    JOB_MAX_AGE: float = 3600.0
+    JOB_MAX_ERRORS: int = 5
+    SSE_KEEPALIVE_INTERVAL: float = 15.0
+
+    # Finished generation responses; the legacy JSON file is imported once if present.
+    RESULTS_STORE_PATH: str = "responses.jsonl"
+    LEGACY_RESULTS_PATH: str = "responses.json"
+
+    # Process pool for CPU-bound audio work: worker processes and max queued + running calls.
+    AUDIO_POOL_WORKERS: int = 2
+    AUDIO_POOL_MAX_PENDING: int = 16
+    # Background clip normalizations allowed in the pool at once; they are skipped while
+    # foreground work keeps every worker busy.
+    NORMALIZE_MAX_CONCURRENCY: int = 1
+
+    # Upload size limits, enforced while the upload is streamed.
+    MAX_IMAGE_UPLOAD_BYTES: int = 20 * 1024 * 1024
+    MAX_AUDIO_UPLOAD_BYTES: int = 200 * 1024 * 1024
+
+    # Reference images for vision models: longest side cap, output format (JPEG or WEBP)
+    # and quality, how many preprocessed images to keep by content hash, and how many
+    # are decoded at once (in threads, separate from the audio process pool).
+    IMAGE_MAX_SIDE: int = 1536
+    IMAGE_OUTPUT_FORMAT: str = "JPEG"
+    IMAGE_QUALITY: int = 85
+    IMAGE_CACHE_MAX_SIZE: int = 256
+    IMAGE_PREPROCESS_CONCURRENCY: int = 2
+    # Base64 data URLs of recent reference images, reused across a session's prompt updates.
+    # Bounded by total size; a single data URL above PROMPT_IMAGE_CACHE_MAX_ENTRY_BYTES
+    # (e.g. an unprocessed fallback upload) is not cached.
+    PROMPT_IMAGE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    PROMPT_IMAGE_CACHE_MAX_ENTRY_BYTES: int = 4 * 1024 * 1024
+    PROMPT_IMAGE_CACHE_TTL: float = 3600.0
+
+    # Remote audio downloads: byte cap, timeouts (seconds) and pooling.
+    AUDIO_FETCH_MAX_BYTES: int = 200 * 1024 * 1024
+    AUDIO_FETCH_TOTAL_TIMEOUT: float = 300.0
+    AUDIO_FETCH_CONNECT_TIMEOUT: float = 10.0
+    AUDIO_FETCH_IDLE_TIMEOUT: float = 30.0
+    AUDIO_FETCH_MAX_CONNECTIONS: int = 50
+    AUDIO_FETCH_MAX_CONCURRENCY: int = 16
+
+    # Lifetime (seconds) of download links returned by /merge-audio-and-transcription/.
+    MERGED_AUDIO_LINK_TTL: int = 900
+    MERGED_AUDIO_DIR: str = "merged_audio_downloads"
+
+    # Whisper transcription: concurrent uploads, and chunking of long audio.
+    TRANSCRIPTION_MAX_CONCURRENCY: int = 4
+    TRANSCRIPTION_CHUNK_SECONDS: float = 300.0
+    TRANSCRIPTION_CHUNK_MAX_BYTES: int = 24 * 1024 * 1024
+
+    # Content-addressed transcription cache: on-disk directory and in-memory LRU size.
+    # Transcripts expire after TRANSCRIPTION_CACHE_MAX_AGE seconds, like the session audio,
+    # and the session reaper trims the disk tier to TRANSCRIPTION_CACHE_MAX_BYTES.
+    TRANSCRIPTION_CACHE_DIR: str = "transcription_cache"
+    TRANSCRIPTION_CACHE_MAX_ENTRIES: int = 1024
+    TRANSCRIPTION_CACHE_MAX_AGE: float = 6 * 3600.0
+    TRANSCRIPTION_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # Audio session storage: "local", "shared" (directory mounted on every node) or "gridfs".
+    # SESSION_BASE_DIR is the session directory for "local" and the per-node clip cache for "gridfs".
+    SESSION_STORE_BACKEND: str = "local"
+    SESSION_BASE_DIR: str = "temp_audio_sessions"
+    SESSION_SHARED_DIR: str = "/mnt/shared/audio_sessions"
+    SESSION_LOCK_TIMEOUT: float = 30.0
+    MONGODB_URI: str = "mongodb://localhost:27017"
+    MONGODB_DATABASE: str = "ai_art_render"
+
+    # Session reaper: idle sessions expire after SESSION_IDLE_TTL seconds, and the oldest
+    # are evicted while all sessions together exceed SESSION_MAX_TOTAL_BYTES.
+    SESSION_IDLE_TTL: float = 6 * 3600.0
+    SESSION_MAX_TOTAL_BYTES: int = 10 * 1024 * 1024 * 1024
+    SESSION_REAPER_INTERVAL: float = 300.0
+
     class Config:
         env_file = '.env', '.env.prod', '.env.local'
-        extra = "ignore"
\ No newline at end of file
+        extra = "ignore"
+
+
+@lru_cache
+def get_settings() -> APISettings:
+    """Settings parsed once per process and shared by all modules."""
+    return APISettings()
@@ -0,0 +1,23 @@
+"""Helpers for running local aiohttp stub servers inside benchmarks."""
+import asyncio
+import threading
+
+from aiohttp import web
+
+
+def serve_in_thread(app: web.Application, host: str, port: int) -> None:
+    """
+    Serves `app` on its own event loop in a daemon thread, so blocking clients
+    in the benchmark cannot stall the stub.
+    """
+    ready = threading.Event()
+
+    async def serve():
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        ready.set()
+        await asyncio.Event().wait()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+    ready.wait()
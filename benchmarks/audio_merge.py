@@ -0,0 +1,76 @@
+"""
+Merges N one-minute clips with the old pydub approach (decode everything into
+one AudioSegment, concatenate with +=, export) and with `merge_audio_files`.
+Requires ffmpeg/ffprobe on PATH.
+
+    python -m benchmarks.audio_merge --clips 50 --seconds 60
+"""
+import argparse
+import os
+import resource
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pydub import AudioSegment
+
+
+def make_clips(workdir: str, clips: int, seconds: int, codec_args: list[str], ext: str) -> list[str]:
+    paths = []
+    for i in range(clips):
+        path = os.path.join(workdir, f"clip_{i:03d}.{ext}")
+        subprocess.run(
+            [AudioSegment.converter, "-y", "-v", "error", "-f", "lavfi",
+             "-i", f"sine=frequency={220 + i * 5}:duration={seconds}:sample_rate=44100",
+             "-ac", "2", *codec_args, path],
+            check=True,
+        )
+        paths.append(path)
+    return paths
+
+
+def pydub_merge(paths: list[str], output_path: str) -> tuple[float, int]:
+    start = time.perf_counter()
+    combined_audio = AudioSegment.empty()
+    for file_path in paths:
+        combined_audio += AudioSegment.from_file(file_path)
+    combined_audio.export(output_path, format="mp3")
+    return time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def streaming_merge(paths: list[str], output_path: str) -> tuple[float, int]:
+    from app.services.audio_merge import merge_audio_files
+    start = time.perf_counter()
+    merge_audio_files(paths, output_path)
+    elapsed = time.perf_counter() - start
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return elapsed, peak
+
+
+def run_isolated(fn, paths: list[str], output_path: str) -> tuple[float, int]:
+    """Runs each merge in a fresh process so peak RSS is measured independently."""
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(fn, paths, output_path).result()
+
+
+def main(clips: int, seconds: int) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        cases = {
+            "mp3 (frame copy)": make_clips(workdir, clips, seconds, ["-c:a", "libmp3lame", "-b:a", "128k"], "mp3"),
+            "wav (re-encode)": make_clips(workdir, clips, seconds, ["-c:a", "pcm_s16le"], "wav"),
+        }
+        print(f"{clips} clips x {seconds} s")
+        for name, paths in cases.items():
+            for label, fn in (("pydub", pydub_merge), ("streaming", streaming_merge)):
+                elapsed, peak_kb = run_isolated(fn, paths, os.path.join(workdir, f"out_{label}.mp3"))
+                print(f"  {name:<17} {label:<10} {elapsed:7.2f} s   peak RSS {peak_kb / 1024:8.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clips", type=int, default=50)
+    parser.add_argument("--seconds", type=int, default=60)
+    args = parser.parse_args()
+    main(args.clips, args.seconds)
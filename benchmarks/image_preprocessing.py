@@ -0,0 +1,105 @@
+"""
+Payload and latency benchmark for reference-image preprocessing.
+
+Builds a large photo-like PNG, then sends it to a local fake vision endpoint
+raw and preprocessed. The fake server charges upload time at `--uplink-mbps`
+(the stub itself is on localhost), plus a fixed model latency.
+
+    python -m benchmarks.image_preprocessing --width 4000 --height 3000 --uplink-mbps 20
+"""
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+import time
+
+from aiohttp import web
+
+from benchmarks._stub_server import serve_in_thread
+
+HOST, PORT = "127.0.0.1", 8768
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+os.environ.setdefault("GEMINI_API_KEY", "fake")
+os.environ["OPENAI_BASE_URL"] = f"http://{HOST}:{PORT}/v1"
+
+
+def make_fake_vision_llm(uplink_mbps: float, model_latency: float) -> web.Application:
+    async def chat_completions(request: web.Request) -> web.Response:
+        body = await request.read()
+        await asyncio.sleep(len(body) * 8 / (uplink_mbps * 1_000_000) + model_latency)
+        content = json.dumps({"prompt": "A quiet harbour at dawn, watercolour --ar 16:9"})
+        return web.json_response({
+            "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+            "model": "gpt-4.1-nano-2025-04-14",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+        })
+
+    app = web.Application(client_max_size=100 * 1024 * 1024)
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    return app
+
+
+def make_photo_png(width: int, height: int) -> bytes:
+    from PIL import Image, ImageFilter
+
+    # Smoothed noise compresses about as badly as a real photo does in PNG.
+    noise = Image.effect_noise((width, height), 64).filter(ImageFilter.GaussianBlur(1))
+    gradient = Image.linear_gradient("L").resize((width, height))
+    image = Image.merge("RGB", (noise, gradient, Image.eval(noise, lambda v: 255 - v)))
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+async def main(width: int, height: int, uplink_mbps: float, model_latency: float) -> None:
+    from app.core.clients import clients
+    from app.services.image_preprocessing import image_preprocessor, preprocess_image
+    from app.services.prompt_generator import generate_prompt_openai
+    from app.services.prompt_requests import ImageInput
+    from app.services.uploads import IngestedUpload
+
+    serve_in_thread(make_fake_vision_llm(uplink_mbps, model_latency), HOST, PORT)
+    await clients.start()
+    try:
+        # Load Pillow's codecs before timing.
+        preprocess_image(make_photo_png(64, 64), 32, "JPEG", 85)
+        raw = make_photo_png(width, height)
+        upload = IngestedUpload(mime_type="image/png", size=len(raw), sha256=hashlib.sha256(raw).hexdigest(),
+                                data=raw)
+
+        start = time.perf_counter()
+        await generate_prompt_openai(previous_prompt="A harbour", image=ImageInput.from_bytes(raw, "image/png"),
+                                     use_cache=False)
+        raw_latency = time.perf_counter() - start
+
+        start = time.perf_counter()
+        image = await image_preprocessor.prepare(upload)
+        preprocess = time.perf_counter() - start
+        start = time.perf_counter()
+        await generate_prompt_openai(previous_prompt="A harbour", image=image, use_cache=False)
+        processed_latency = preprocess + time.perf_counter() - start
+
+        start = time.perf_counter()
+        await image_preprocessor.prepare(upload)
+        cached = time.perf_counter() - start
+    finally:
+        await clients.close()
+
+    print(f"{width}x{height} PNG, {uplink_mbps:.0f} Mbit/s uplink, {model_latency * 1000:.0f} ms model latency")
+    print(f"  raw:          {len(raw) / 1e6:6.2f} MB image  {raw_latency * 1000:8.1f} ms per request")
+    print(f"  preprocessed: {len(image.data) / 1e6:6.2f} MB {image.mime_type:<10}  {processed_latency * 1000:8.1f} ms per request "
+          f"({preprocess * 1000:.1f} ms preprocessing)")
+    print(f"  cache hit:    {cached * 1000:8.3f} ms preprocessing")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--uplink-mbps", type=float, default=20.0)
+    parser.add_argument("--model-latency", type=float, default=0.3)
+    args = parser.parse_args()
+    asyncio.run(main(args.width, args.height, args.uplink_mbps, args.model_latency))
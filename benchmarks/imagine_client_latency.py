@@ -0,0 +1,77 @@
+"""
+Per-call latency of Imagine API status polls against a local stub server:
+a fresh httpx.AsyncClient per call (old behaviour) versus the shared pooled client.
+
+    python -m benchmarks.imagine_client_latency --calls 500
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+from aiohttp import web
+
+from benchmarks._stub_server import serve_in_thread
+
+HOST, PORT = "127.0.0.1", 8766
+os.environ.setdefault("IMAGINE_DEV_API_KEY", "fake")
+
+from app.core.clients import clients  # noqa: E402
+from app.services import sending_generation_request as imagine  # noqa: E402
+
+
+def make_stub() -> web.Application:
+    async def status(request: web.Request) -> web.Response:
+        return web.json_response({"data": {"id": request.match_info["image_id"], "status": "in-progress"}})
+
+    app = web.Application()
+    app.router.add_get("/items/images/{image_id}", status)
+    return app
+
+
+async def per_call_client(calls: int) -> list[float]:
+    timings = []
+    for i in range(calls):
+        start = time.perf_counter()
+        async with httpx.AsyncClient() as client:
+            response = await client.get(f"{imagine.BASE_URL}/items/images/{i}")
+            response.raise_for_status()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def shared_client(calls: int) -> list[float]:
+    imagine.get_http_client()
+    timings = []
+    try:
+        for i in range(calls):
+            start = time.perf_counter()
+            await imagine.check_generation_status(str(i))
+            timings.append(time.perf_counter() - start)
+    finally:
+        await clients.close()
+    return timings
+
+
+def summarize(name: str, timings: list[float]) -> None:
+    ms = sorted(t * 1000 for t in timings)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(f"  {name:<16} p50 {statistics.median(ms):6.2f} ms   p95 {p95:6.2f} ms   mean {statistics.fmean(ms):6.2f} ms")
+
+
+async def main(calls: int) -> None:
+    serve_in_thread(make_stub(), HOST, PORT)
+    imagine.BASE_URL = f"http://{HOST}:{PORT}"
+    imagine.logger.remove()
+
+    print(f"{calls} sequential status polls")
+    summarize("client per call", await per_call_client(calls))
+    summarize("shared client", await shared_client(calls))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=500)
+    asyncio.run(main(parser.parse_args().calls))
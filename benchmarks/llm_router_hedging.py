@@ -0,0 +1,73 @@
+"""
+Tail-latency benchmark for the prompt provider router with two fake providers.
+
+"fast" usually answers in ~100 ms but stalls for `--stall` seconds on a fraction
+of calls (a degraded vendor); "steady" always takes ~250 ms. Compares routing
+without and with hedging.
+
+    python -m benchmarks.llm_router_hedging --requests 200 --stall-rate 0.1
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+os.environ.setdefault("GEMINI_API_KEY", "fake")
+
+from app.services.llm_router import LLMRouter
+
+
+def make_provider(delay: float, stall: float = 0.0, stall_rate: float = 0.0):
+    async def provider(**kwargs) -> dict:
+        await asyncio.sleep(stall if random.random() < stall_rate else delay * random.uniform(0.9, 1.1))
+        return {"prompt": "A quiet harbour at dawn, watercolour --ar 16:9"}
+    return provider
+
+
+async def run(router: LLMRouter, requests: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await router.generate(place="harbour")
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+def report(label: str, latencies: list[float], router: LLMRouter) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    stats = router.stats()
+    print(f"{label:<10} p50 {quantiles[49] * 1000:7.1f} ms   p95 {quantiles[94] * 1000:7.1f} ms   "
+          f"p99 {quantiles[98] * 1000:7.1f} ms   hedges {stats['hedges']:4d} (won {stats['hedge_wins']})")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--stall", type=float, default=2.0)
+    parser.add_argument("--stall-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    for hedge in (False, True):
+        random.seed(0)
+        router = LLMRouter(
+            {
+                "fast": make_provider(0.1, stall=args.stall, stall_rate=args.stall_rate),
+                "steady": make_provider(0.25),
+            },
+            hedge=hedge, hedge_min_delay=0.15,
+        )
+        latencies = await run(router, args.requests, args.concurrency)
+        report("hedged" if hedge else "unhedged", latencies, router)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
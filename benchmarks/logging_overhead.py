@@ -0,0 +1,111 @@
+"""
+Per-request logging overhead of an Imagine API status poll.
+
+Replays the log lines of `--requests` status polls (a fraction of them failing)
+under the previous setup (console, the lifespan's INFO file sink and the
+import-time DEBUG file sink with backtrace/diagnose, all synchronous) and under
+`configure_logging` (enqueued sinks, sampled success lines, lazy redacted
+DEBUG lines). Reports the time spent in the request path per poll, and how long
+the background writer then needs to drain. Console output goes to /dev/null.
+
+    python -m benchmarks.logging_overhead --requests 20000 --error-rate 0.05
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import traceback
+
+import httpx
+from loguru import logger
+
+from app.core.logging import configure_logging, redact_headers, sampled
+from app.settings import APISettings
+
+HEADERS = {"Authorization": "Bearer sk-imagine-secret", "Content-Type": "application/json"}
+URL = "https://cl.imagineapi.dev/items/images/0f8fad5b-d9cb-469f-a165-70867728950e"
+
+
+def status_error() -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", URL)
+    response = httpx.Response(502, request=request, text="<html>Bad gateway</html>")
+    return httpx.HTTPStatusError("Bad gateway", request=request, response=response)
+
+
+def legacy_poll(image_id: str, fail: bool) -> None:
+    """The log lines check_generation_status wrote before the logging setup."""
+    logger.debug(f"GET {URL} with headers={HEADERS}")
+    try:
+        if fail:
+            raise status_error()
+        logger.success(f"✅ Status check successful for image_id={image_id}")
+    except httpx.HTTPStatusError as e:
+        logger.error(f"❌ HTTP error during status check: {e.response.status_code} - {e.response.text}")
+        logger.error(traceback.format_exc())
+
+
+_status_log = sampled("imagine_status")
+
+
+def current_poll(image_id: str, fail: bool) -> None:
+    logger.opt(lazy=True).debug("GET {} with headers={}", lambda: URL, lambda: redact_headers(HEADERS))
+    try:
+        if fail:
+            raise status_error()
+        _status_log.success(f"✅ Status check successful for image_id={image_id}")
+    except httpx.HTTPStatusError as e:
+        logger.error(f"❌ HTTP error during status check: {e.response.status_code} - {e.response.text}")
+
+
+def configure_legacy(directory: str, console) -> None:
+    logger.remove()
+    logger.add(console)
+    logger.add(os.path.join(directory, "logs.log"), rotation="10 MB", level="INFO")
+    logger.add(os.path.join(directory, "logs.log"), level="DEBUG", backtrace=True, diagnose=True,
+               rotation="10 MB", retention="10 days")
+
+
+def configure_current(directory: str, console) -> None:
+    stderr, sys.stderr = sys.stderr, console
+    try:
+        configure_logging(APISettings(LOG_FILE=os.path.join(directory, "logs.log")), force=True)
+    finally:
+        sys.stderr = stderr
+
+
+def run(poll, requests: int, error_rate: float) -> tuple[float, float]:
+    every = round(1 / error_rate) if error_rate else 0
+    started = time.perf_counter()
+    for i in range(requests):
+        poll(f"job-{i % 50}", bool(every) and i % every == every - 1)
+    in_path = time.perf_counter() - started
+    logger.complete()
+    drained = time.perf_counter() - started
+    return in_path, drained
+
+
+def main(requests: int, error_rate: float) -> None:
+    with open(os.devnull, "w") as console:
+        results = {}
+        for name, configure, poll in (("legacy", configure_legacy, legacy_poll),
+                                      ("current", configure_current, current_poll)):
+            with tempfile.TemporaryDirectory() as directory:
+                configure(directory, console)
+                in_path, drained = run(poll, requests, error_rate)
+                logger.remove()
+                size = os.path.getsize(os.path.join(directory, "logs.log"))
+            results[name] = (in_path, drained, size)
+
+    print(f"{requests} status polls, {error_rate:.0%} failing")
+    for name, (in_path, drained, size) in results.items():
+        print(f"  {name:<8} {in_path / requests * 1e6:8.1f} µs/request in the request path   "
+              f"{drained:6.2f} s until written   {size / 1e6:6.2f} MB logged")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    args = parser.parse_args()
+    main(args.requests, args.error_rate)
@@ -0,0 +1,90 @@
+"""
+Load benchmark for prompt generation against a local fake LLM server.
+
+Compares the old blocking path (sync OpenAI client called from the event loop,
+so requests are served one at a time) with the async `generate_prompt_openai`.
+
+    python -m benchmarks.prompt_generation_load --requests 64 --delay 0.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from aiohttp import web
+
+from benchmarks._stub_server import serve_in_thread
+
+HOST, PORT = "127.0.0.1", 8765
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+os.environ.setdefault("GEMINI_API_KEY", "fake")
+os.environ["OPENAI_BASE_URL"] = f"http://{HOST}:{PORT}/v1"
+
+
+def make_fake_llm(delay: float) -> web.Application:
+    async def chat_completions(request: web.Request) -> web.Response:
+        await asyncio.sleep(delay)
+        content = json.dumps({"prompt": "A quiet harbour at dawn, watercolour --ar 16:9"})
+        return web.json_response({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4.1-nano-2025-04-14",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+        })
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    return app
+
+
+FORM = dict(place="harbour", time="dawn", object="boat", action="drifting",
+            style="Watercolour", other="gulls")
+
+
+async def run_blocking(n: int) -> float:
+    from openai import OpenAI
+    client = OpenAI()
+    start = time.perf_counter()
+
+    async def handler():
+        # What the routes did before: a sync call inside an async handler.
+        client.chat.completions.create(
+            model="gpt-4.1-nano-2025-04-14",
+            messages=[{"role": "user", "content": str(FORM)}],
+            response_format={"type": "json_object"},
+        )
+
+    await asyncio.gather(*(handler() for _ in range(n)))
+    return time.perf_counter() - start
+
+
+async def run_async(n: int) -> float:
+    from app.services.prompt_generator import generate_prompt_openai
+    start = time.perf_counter()
+    await asyncio.gather(*(generate_prompt_openai(**FORM) for _ in range(n)))
+    return time.perf_counter() - start
+
+
+async def main(n: int, delay: float) -> None:
+    from app.core.clients import clients
+
+    serve_in_thread(make_fake_llm(delay), HOST, PORT)
+    await clients.start()
+    blocking = await run_blocking(n)
+    concurrent = await run_async(n)
+
+    print(f"{n} requests, {delay * 1000:.0f} ms simulated LLM latency")
+    print(f"  blocking: {blocking:7.2f} s  ({n / blocking:6.1f} req/s)")
+    print(f"  async:    {concurrent:7.2f} s  ({n / concurrent:6.1f} req/s)")
+    print(f"  speedup:  {blocking / concurrent:7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--delay", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.delay))
@@ -0,0 +1,129 @@
+"""
+Allocation benchmark for building vision prompt requests with a large reference image.
+
+Traces (tracemalloc) the peak Python memory allocated per request for repeated
+/update-prompt/ calls with the same uploaded photo, comparing:
+
+- legacy: the previous per-call base64 encoding of the raw upload;
+- raw fallback: the request builder when preprocessing falls back to the raw
+  upload (undecodable image). Such data URLs are too large for the cache, so
+  every call encodes again, like legacy;
+- preprocessed: the real request path, `image_preprocessor.prepare` followed
+  by the builder. Pillow's decode buffers are allocated outside Python and are
+  not traced; the first request pays for the re-encoded image and its data
+  URL, repeats hit both caches.
+
+No network calls are made.
+
+    python -m benchmarks.prompt_request_allocations --width 4000 --height 3000 --calls 5
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import io
+import os
+import tracemalloc
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+os.environ.setdefault("GEMINI_API_KEY", "fake")
+os.environ.setdefault("LOG_FILE", "")
+
+from app.services.image_preprocessing import image_preprocessor, preprocess_image
+from app.services.prompt_generator import SYSTEM_INSTRUCTION_UPDATE, build_prompt_request
+from app.services.prompt_requests import ImageInput, data_url_cache, gemini_contents, openai_messages
+from app.services.uploads import IngestedUpload
+
+PREVIOUS_PROMPT = "A quiet harbour at dawn, watercolour --ar 16:9"
+
+
+def make_photo_png(width: int, height: int) -> bytes:
+    from PIL import Image, ImageFilter
+
+    # Smoothed noise compresses about as badly as a real photo does in PNG.
+    noise = Image.effect_noise((width, height), 64).filter(ImageFilter.GaussianBlur(1))
+    gradient = Image.linear_gradient("L").resize((width, height))
+    image = Image.merge("RGB", (noise, gradient, Image.eval(noise, lambda v: 255 - v)))
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def legacy_messages(image_bytes: bytes, mime_type: str) -> list[dict]:
+    """What generate_prompt_openai did on every call before the request builder."""
+    hashlib.sha256(image_bytes).hexdigest()  # prompt cache key
+    base64_image = base64.b64encode(image_bytes).decode('utf-8')
+    return [
+        {"role": "system", "content": SYSTEM_INSTRUCTION_UPDATE},
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": f"Here is the previous prompt to update:\n\n{PREVIOUS_PROMPT}"},
+                {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{base64_image}"}},
+            ],
+        },
+    ]
+
+
+def builder_request(image: ImageInput):
+    return build_prompt_request(None, None, None, None, None, None, PREVIOUS_PROMPT, image)
+
+
+async def preprocessed_messages(upload: IngestedUpload) -> list[dict]:
+    image = await image_preprocessor.prepare(upload)
+    return openai_messages(builder_request(image))
+
+
+async def traced_peaks(build, calls: int) -> list[int]:
+    peaks = []
+    tracemalloc.start()
+    for _ in range(calls):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        messages = await build()
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+        del messages
+    tracemalloc.stop()
+    return peaks
+
+
+def synchronous(build):
+    async def run():
+        return build()
+    return run
+
+
+async def main(width: int, height: int, calls: int) -> None:
+    raw = make_photo_png(width, height)
+    raw_image = ImageInput.from_bytes(raw, "image/png")
+    upload = IngestedUpload(mime_type="image/png", size=len(raw), sha256=raw_image.sha256, data=raw)
+    # Import the Gemini types and load Pillow's JPEG encoder before tracing.
+    gemini_contents(builder_request(ImageInput.from_bytes(b"", "image/png")))
+    preprocess_image(make_photo_png(8, 8), 4, "JPEG", 85)
+    data_url_cache.clear()
+
+    rows = {
+        "legacy openai": await traced_peaks(synchronous(lambda: legacy_messages(raw, "image/png")), calls),
+        "raw fallback openai": await traced_peaks(
+            synchronous(lambda: openai_messages(builder_request(raw_image))), calls),
+        "preprocessed openai": await traced_peaks(lambda: preprocessed_messages(upload), calls),
+        "raw gemini": await traced_peaks(synchronous(lambda: gemini_contents(builder_request(raw_image))), calls),
+    }
+    sent = await image_preprocessor.prepare(upload)
+
+    mb = 1024 * 1024
+    print(f"{width}x{height} PNG of {len(raw) / mb:.1f} MB (preprocessed: {len(sent.data) / mb:.2f} MB "
+          f"{sent.mime_type}), {calls} consecutive update-prompt requests (peak MB allocated per request)")
+    for name, peaks in rows.items():
+        print(f"  {name:<20} first {peaks[0] / mb:6.1f}   repeat {max(peaks[1:]) / mb:6.1f}   "
+              f"total {sum(peaks) / mb:7.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--calls", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.width, args.height, max(args.calls, 2)))
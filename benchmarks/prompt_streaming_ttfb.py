@@ -0,0 +1,97 @@
+"""
+Time-to-first-text benchmark for streamed prompt generation against a local fake LLM.
+
+The fake server emits the JSON completion word by word with a fixed delay per
+token. Compares waiting for the whole completion (`generate_prompt_openai`)
+with reading the prompt text as it streams (`stream_prompt_openai` + PromptExtractor).
+
+    python -m benchmarks.prompt_streaming_ttfb --token-delay 0.03 --first-token 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from aiohttp import web
+
+from benchmarks._stub_server import serve_in_thread
+
+HOST, PORT = "127.0.0.1", 8766
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+os.environ.setdefault("GEMINI_API_KEY", "fake")
+os.environ["OPENAI_BASE_URL"] = f"http://{HOST}:{PORT}/v1"
+
+PROMPT = ("A quiet harbour at dawn, fishing boats drifting on glassy water while gulls circle "
+          "overhead, soft watercolour washes, pale gold light breaking through mist --ar 16:9")
+FORM = dict(place="harbour", time="dawn", object="boat", action="drifting",
+            style="Watercolour", other="gulls", use_cache=False)
+
+
+def make_fake_llm(first_token: float, token_delay: float) -> web.Application:
+    content = json.dumps({"prompt": PROMPT})
+    tokens = [word + " " for word in content.split(" ")]
+    tokens[-1] = tokens[-1].rstrip()
+
+    def chunk(delta: dict, finish_reason: str | None = None) -> dict:
+        return {
+            "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+            "model": "gpt-4.1-nano-2025-04-14",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    async def chat_completions(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        await asyncio.sleep(first_token)
+        if not body.get("stream"):
+            await asyncio.sleep(token_delay * len(tokens))
+            return web.json_response({
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+                "model": "gpt-4.1-nano-2025-04-14",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+            })
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for token in tokens:
+            await response.write(f"data: {json.dumps(chunk({'content': token}))}\n\n".encode())
+            await asyncio.sleep(token_delay)
+        await response.write(f"data: {json.dumps(chunk({}, 'stop'))}\n\ndata: [DONE]\n\n".encode())
+        return response
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    return app
+
+
+async def main(first_token: float, token_delay: float) -> None:
+    from app.core.clients import clients
+    from app.services.prompt_generator import generate_prompt_openai, stream_prompt_openai
+    from app.services.prompt_stream import PromptExtractor
+
+    serve_in_thread(make_fake_llm(first_token, token_delay), HOST, PORT)
+    await clients.start()
+
+    start = time.perf_counter()
+    await generate_prompt_openai(**FORM)
+    buffered = time.perf_counter() - start
+
+    start = time.perf_counter()
+    extractor, first_text = PromptExtractor(), None
+    async for raw in stream_prompt_openai(**FORM):
+        if extractor.feed(raw) and first_text is None:
+            first_text = time.perf_counter() - start
+    streamed_total = time.perf_counter() - start
+    assert extractor.text == PROMPT
+
+    print(f"{first_token * 1000:.0f} ms to first token, {token_delay * 1000:.0f} ms per token")
+    print(f"  buffered: first text after {buffered * 1000:7.1f} ms")
+    print(f"  streamed: first text after {first_text * 1000:7.1f} ms (complete after {streamed_total * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--first-token", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.03)
+    args = parser.parse_args()
+    asyncio.run(main(args.first_token, args.token_delay))
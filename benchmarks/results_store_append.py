@@ -0,0 +1,83 @@
+"""
+Append cost of the JSON-Lines results store versus the old rewrite-the-whole-file
+`append_to_json_file`, at increasing numbers of stored responses.
+
+    python -m benchmarks.results_store_append --sizes 1000 10000 100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from app.services.results_store import ResultsStore
+
+
+def make_response(i: int) -> dict:
+    return {
+        "id": f"img-{i:08d}", "status": "completed", "progress": 100, "error": None,
+        "prompt": "A lighthouse on a cliff at dusk, impressionist --ar 16:9",
+        "url": f"https://cl.imagineapi.dev/assets/{i}/grid.png", "ref": None,
+        "upscaled_urls": [f"https://cl.imagineapi.dev/assets/{i}/{n}.png" for n in range(4)],
+        "user_created": "user", "date_created": "2025-01-01T00:00:00Z",
+        "model_type": "MJ", "integration_id": None,
+    }
+
+
+def legacy_append(data: dict, filename: str) -> None:
+    """The previous implementation, minus logging."""
+    if os.path.exists(filename):
+        with open(filename, "r", encoding="utf-8") as file:
+            existing_data = json.load(file)
+    else:
+        existing_data = []
+    ids = [item['id'] for item in existing_data]
+    if data['id'] not in ids:
+        existing_data.append(data)
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump(existing_data, file, indent=4)
+
+
+async def bench(size: int, appends: int, legacy_appends: int, workdir: str) -> None:
+    jsonl_path = os.path.join(workdir, f"responses-{size}.jsonl")
+    with open(jsonl_path, "w", encoding="utf-8") as file:
+        file.writelines(json.dumps(make_response(i)) + "\n" for i in range(size))
+
+    store = ResultsStore(jsonl_path)
+    start = time.perf_counter()
+    await store.load()
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(size, size + appends):
+        await store.append(make_response(i))
+    store_per_append = (time.perf_counter() - start) / appends
+
+    json_path = os.path.join(workdir, f"responses-{size}.json")
+    with open(json_path, "w", encoding="utf-8") as file:
+        json.dump([make_response(i) for i in range(size)], file, indent=4)
+    start = time.perf_counter()
+    for i in range(size, size + legacy_appends):
+        legacy_append(make_response(i), json_path)
+    legacy_per_append = (time.perf_counter() - start) / legacy_appends
+
+    print(f"{size:>8} stored | jsonl append {store_per_append * 1e6:8.1f} us"
+          f" | legacy append {legacy_per_append * 1e3:9.1f} ms | index rebuild {load_time * 1e3:7.1f} ms")
+
+
+async def main(sizes: list[int], appends: int, legacy_appends: int) -> None:
+    from loguru import logger
+    logger.remove()
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            await bench(size, appends, legacy_appends, workdir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--appends", type=int, default=1_000)
+    parser.add_argument("--legacy-appends", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.appends, args.legacy_appends))
@@ -0,0 +1,66 @@
+"""
+Import and startup time of the app, each measured in a fresh interpreter.
+
+"import" is `import app.main` (what test collection and each gunicorn worker
+pay); "clients" is the lifespan's `clients.start()` that follows in a worker.
+The "eager" row reproduces the previous behaviour, where importing the
+services also imported the OpenAI and Gemini SDKs and built their clients, so
+there was nothing left to create at startup.
+
+    python -m benchmarks.startup_time --runs 7
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+EAGER = """
+from openai import AsyncOpenAI
+from google import genai
+from dotenv import load_dotenv
+load_dotenv(override=True)
+genai.Client(api_key="fake")
+AsyncOpenAI(api_key="sk-fake")
+AsyncOpenAI(api_key="sk-fake")
+"""
+
+SCRIPT = """
+import asyncio, json, time
+started = time.perf_counter()
+{eager}
+import app.main
+imported = time.perf_counter()
+if {lazy}:
+    from app.core.clients import clients
+    asyncio.run(clients.start())
+print(json.dumps({{"import": imported - started, "clients": time.perf_counter() - imported}}))
+"""
+
+
+def measure(eager: bool) -> dict[str, float]:
+    env = dict(os.environ, OPENAI_API_KEY="sk-fake", GEMINI_API_KEY="fake", IMAGINE_DEV_API_KEY="fake",
+               LOG_FILE="")
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(eager=EAGER if eager else "", lazy=not eager)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(runs: int) -> None:
+    print(f"median of {runs} fresh interpreters")
+    for name, eager in (("eager", True), ("lazy", False)):
+        samples = [measure(eager) for _ in range(runs)]
+        imported = statistics.median(s["import"] for s in samples)
+        started = statistics.median(s["clients"] for s in samples)
+        print(f"  {name:<6} import {imported * 1000:7.1f} ms   clients.start {started * 1000:7.1f} ms   "
+              f"total {(imported + started) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+    main(max(args.runs, 1))
@@ -0,0 +1,15 @@
+import os
+
+# Settings are read once per process, so the environment has to be in place
+# before the app modules are imported.
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("IMAGINE_DEV_API_KEY", "test")
+os.environ["LOG_FILE"] = ""
+
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
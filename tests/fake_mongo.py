@@ -0,0 +1,147 @@
+"""
+In-memory stand-ins for the parts of Motor that GridFSSessionStore uses: a
+collection supporting its conditional upsert, and a GridFS bucket.
+
+The upsert yields to the event loop between finding no matching document and
+inserting one, like the two steps MongoDB performs, so concurrent upserts of
+a new session race the way they do against a real server.
+"""
+import asyncio
+import copy
+import itertools
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from pymongo.errors import DuplicateKeyError
+
+
+def _matches(document: dict, conditions: dict) -> bool:
+    for field, condition in conditions.items():
+        value = document.get(field)
+        if isinstance(condition, dict) and "$ne" in condition:
+            if condition["$ne"] in (value if isinstance(value, list) else [value]):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _apply(document: dict, update: dict) -> None:
+    for field, value in update.get("$push", {}).items():
+        document.setdefault(field, []).append(value)
+    for field, value in update.get("$pull", {}).items():
+        document[field] = [item for item in document.get(field, []) if item != value]
+    for field, value in update.get("$inc", {}).items():
+        document[field] = document.get(field, 0) + value
+
+
+class FakeCollection:
+    def __init__(self):
+        self.documents: dict = {}
+
+    async def find_one(self, conditions: dict) -> dict | None:
+        document = self.documents.get(conditions["_id"])
+        return copy.deepcopy(document) if document is not None and _matches(document, conditions) else None
+
+    async def find_one_and_update(self, conditions: dict, update: dict, upsert: bool = False, return_document=None):
+        document = self.documents.get(conditions["_id"])
+        if document is not None and _matches(document, conditions):
+            _apply(document, update)
+            return copy.deepcopy(document)
+        if not upsert:
+            return None
+        await asyncio.sleep(0)
+        if conditions["_id"] in self.documents:
+            raise DuplicateKeyError(f"E11000 duplicate key error: _id {conditions['_id']!r}")
+        document = self.documents[conditions["_id"]] = {"_id": conditions["_id"]}
+        _apply(document, update)
+        return copy.deepcopy(document)
+
+    async def update_one(self, conditions: dict, update: dict) -> None:
+        document = self.documents.get(conditions["_id"])
+        if document is not None:
+            _apply(document, update)
+
+    async def delete_one(self, conditions: dict) -> None:
+        self.documents.pop(conditions["_id"], None)
+
+
+class FakeCursor:
+    def __init__(self, files: list[dict]):
+        self._files = files
+
+    def sort(self, keys: list[tuple[str, int]]) -> "FakeCursor":
+        def key(file: dict):
+            return tuple(file["metadata"]["clip"]["seq"] if name == "metadata.clip.seq" else file[name]
+                         for name, _ in keys)
+        return FakeCursor(sorted(self._files, key=key))
+
+    async def __aiter__(self):
+        for file in self._files:
+            yield SimpleNamespace(_id=file["_id"], filename=file["filename"], metadata=file["metadata"])
+
+
+class FakeGridIn:
+    def __init__(self, bucket: "FakeGridFSBucket", filename: str, metadata: dict):
+        self._bucket = bucket
+        self._file = {"_id": next(bucket.ids), "filename": filename, "metadata": copy.deepcopy(metadata)}
+        self._data = bytearray()
+
+    async def write(self, chunk: bytes) -> None:
+        self._data += chunk
+
+    async def close(self) -> None:
+        self._file.update(data=bytes(self._data), length=len(self._data), uploadDate=datetime.now(timezone.utc))
+        self._bucket.files.append(self._file)
+
+    async def abort(self) -> None:
+        self._data.clear()
+
+
+class FakeGridOut:
+    def __init__(self, data: bytes):
+        self._data = data
+        self._offset = 0
+
+    async def read(self, size: int) -> bytes:
+        chunk = self._data[self._offset:self._offset + size]
+        self._offset += len(chunk)
+        return chunk
+
+
+class FakeGridFSBucket:
+    def __init__(self):
+        self.files: list[dict] = []
+        self.ids = itertools.count()
+        self.downloads = 0
+
+    def open_upload_stream(self, filename: str, metadata: dict) -> FakeGridIn:
+        return FakeGridIn(self, filename, metadata)
+
+    async def open_download_stream(self, file_id) -> FakeGridOut:
+        self.downloads += 1
+        return FakeGridOut(next(f for f in self.files if f["_id"] == file_id)["data"])
+
+    def find(self, conditions: dict) -> FakeCursor:
+        session_id = conditions["metadata.session_id"]
+        return FakeCursor([f for f in self.files if f["metadata"]["session_id"] == session_id])
+
+    async def delete(self, file_id) -> None:
+        self.files = [f for f in self.files if f["_id"] != file_id]
+
+
+class FakeFilesCollection:
+    """The bucket's `.files` collection, for the usage aggregation."""
+
+    def __init__(self, bucket: FakeGridFSBucket):
+        self._bucket = bucket
+
+    async def aggregate(self, pipeline: list[dict]):
+        groups: dict[str, dict] = {}
+        for file in self._bucket.files:
+            session_id = file["metadata"]["session_id"]
+            group = groups.setdefault(session_id, {"_id": session_id, "size": 0, "last_modified": file["uploadDate"]})
+            group["size"] += file["length"]
+            group["last_modified"] = max(group["last_modified"], file["uploadDate"])
+        for group in groups.values():
+            yield group
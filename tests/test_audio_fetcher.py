@@ -0,0 +1,215 @@
+import asyncio
+import functools
+import hashlib
+import io
+import os
+import wave
+
+import httpx
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from fastapi import FastAPI, HTTPException
+
+from app.api import routes
+from app.services.audio_fetcher import AudioFetcher, audio_fetcher
+from app.services.session_store import LocalSessionStore
+
+pytestmark = pytest.mark.anyio
+
+ALLOWED = ["audio/wav", "audio/x-wav", "audio/mpeg"]
+MAX_BYTES = 64 * 1024
+
+
+def make_wav(seconds: float = 0.1, tone: int = 0) -> bytes:
+    output = io.BytesIO()
+    with wave.open(output, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(8000)
+        w.writeframes(bytes([tone % 256, 0]) * int(8000 * seconds))
+    return output.getvalue()
+
+
+async def trickle(request: web.Request, chunks: int, delay: float) -> web.StreamResponse:
+    response = web.StreamResponse(headers={"Content-Type": "audio/wav"})
+    await response.prepare(request)
+    wav = make_wav()
+    await response.write(wav)
+    for _ in range(chunks):
+        await asyncio.sleep(delay)
+        await response.write(b"\0" * 16)
+    return response
+
+
+async def chunked(request: web.Request, body: bytes) -> web.StreamResponse:
+    # No Content-Length, so the cap can only be enforced while streaming.
+    response = web.StreamResponse(headers={"Content-Type": "audio/wav"})
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+    for i in range(0, len(body), 4096):
+        await response.write(body[i:i + 4096])
+    return response
+
+
+def serve(body: bytes | str, content_type: str = "audio/wav", status: int = 200):
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(body=body.encode() if isinstance(body, str) else body, content_type=content_type,
+                            status=status)
+    return handler
+
+
+@pytest.fixture
+async def server():
+    app = web.Application()
+    app.router.add_get("/a.wav", serve(make_wav(tone=1)))
+    app.router.add_get("/b.wav", serve(make_wav(tone=2)))
+    app.router.add_get("/a-copy.wav", serve(make_wav(tone=1)))
+    app.router.add_get("/large.wav", serve(make_wav(seconds=5)))
+    app.router.add_get("/large-chunked.wav", functools.partial(chunked, body=make_wav(seconds=5)))
+    app.router.add_get("/page.html", serve("<html><body>not audio</body></html>", content_type="text/html"))
+    app.router.add_get("/missing.wav", serve(b"", status=404))
+    app.router.add_get("/stalls.wav", functools.partial(trickle, chunks=1, delay=5.0))
+    app.router.add_get("/trickles.wav", functools.partial(trickle, chunks=100, delay=0.05))
+    server = TestServer(app)
+    await server.start_server()
+    yield server
+    await server.close()
+
+
+@pytest.fixture
+async def fetcher():
+    fetcher = AudioFetcher(max_bytes=MAX_BYTES, total_timeout=10.0, connect_timeout=5.0, idle_timeout=5.0,
+                           max_connections=10, max_concurrency=4)
+    yield fetcher
+    await fetcher.close()
+
+
+async def test_downloads_to_file_and_hashes(server, fetcher, tmp_path):
+    dest = str(tmp_path / "a.wav")
+
+    upload = await fetcher.fetch_to_file(str(server.make_url("/a.wav")), dest, ALLOWED)
+
+    with open(dest, "rb") as f:
+        data = f.read()
+    assert data == make_wav(tone=1)
+    assert upload.size == len(data)
+    assert upload.sha256 == hashlib.sha256(data).hexdigest()
+    assert upload.mime_type in ("audio/wav", "audio/x-wav")
+
+
+async def test_content_length_over_the_cap_is_rejected_before_streaming(server, fetcher, tmp_path):
+    dest = str(tmp_path / "large.wav")
+
+    with pytest.raises(HTTPException) as raised:
+        await fetcher.fetch_to_file(str(server.make_url("/large.wav")), dest, ALLOWED)
+
+    assert raised.value.status_code == 413
+    assert os.listdir(tmp_path) == []
+
+
+async def test_byte_cap_is_enforced_while_streaming(server, fetcher, tmp_path):
+    dest = str(tmp_path / "large.wav")
+
+    with pytest.raises(HTTPException) as raised:
+        await fetcher.fetch_to_file(str(server.make_url("/large-chunked.wav")), dest, ALLOWED)
+
+    assert raised.value.status_code == 413
+    assert os.listdir(tmp_path) == []
+
+
+async def test_idle_timeout(server, tmp_path):
+    fetcher = AudioFetcher(max_bytes=MAX_BYTES, total_timeout=10.0, connect_timeout=5.0, idle_timeout=0.2,
+                           max_connections=10, max_concurrency=4)
+    try:
+        with pytest.raises(HTTPException) as raised:
+            await fetcher.fetch_to_file(str(server.make_url("/stalls.wav")), str(tmp_path / "a.wav"), ALLOWED)
+    finally:
+        await fetcher.close()
+
+    assert raised.value.status_code == 504
+    assert os.listdir(tmp_path) == []
+
+
+async def test_total_timeout(server, tmp_path):
+    # Every read arrives well within the idle timeout, but the whole download does not finish in time.
+    fetcher = AudioFetcher(max_bytes=MAX_BYTES, total_timeout=0.5, connect_timeout=5.0, idle_timeout=5.0,
+                           max_connections=10, max_concurrency=4)
+    try:
+        with pytest.raises(HTTPException) as raised:
+            await fetcher.fetch_to_file(str(server.make_url("/trickles.wav")), str(tmp_path / "a.wav"), ALLOWED)
+    finally:
+        await fetcher.close()
+
+    assert raised.value.status_code == 504
+    assert os.listdir(tmp_path) == []
+
+
+async def test_non_audio_content_is_rejected(server, fetcher, tmp_path):
+    with pytest.raises(HTTPException) as raised:
+        await fetcher.fetch_to_file(str(server.make_url("/page.html")), str(tmp_path / "a.wav"), ALLOWED)
+
+    assert raised.value.status_code == 400
+    assert "text/html" in raised.value.detail
+    assert os.listdir(tmp_path) == []
+
+
+async def test_fetch_many_returns_failures_in_place(server, fetcher, tmp_path):
+    paths = ["/a.wav", "/page.html", "/missing.wav", "/large.wav", "/b.wav"]
+    dests = [str(tmp_path / f"{i}.wav") for i in range(len(paths))]
+
+    results = await fetcher.fetch_many([str(server.make_url(path)) for path in paths], dests, ALLOWED)
+
+    assert [getattr(result, "status_code", None) for result in results] == [None, 400, 500, 413, None]
+    assert sorted(os.listdir(tmp_path)) == ["0.wav", "4.wav"]
+
+
+@pytest.fixture
+async def api(tmp_path, monkeypatch):
+    store = LocalSessionStore(str(tmp_path / "sessions"))
+    monkeypatch.setattr(routes, "session_store", store)
+    monkeypatch.setattr(routes, "probe_audio", lambda path: None)
+    monkeypatch.setattr(routes.session_normalizer, "schedule", lambda session_id, clip_path: None)
+    monkeypatch.setattr(audio_fetcher, "max_bytes", MAX_BYTES)
+    app = FastAPI()
+    app.include_router(routes.router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client, store
+    await audio_fetcher.close()
+
+
+async def test_add_audio_urls_reports_added_skipped_and_failed(server, api):
+    client, store = api
+    url = lambda path: str(server.make_url(path))
+    await client.post("/add-audio-url-to-session/", data={"session_id": "s1", "audio_url": url("/b.wav")})
+
+    response = await client.post("/add-audio-urls-to-session/", data={
+        "session_id": "s1",
+        "audio_urls": [url("/a.wav"), url("/page.html"), url("/b.wav"), url("/large.wav"),
+                       url("/a.wav"), url("/a-copy.wav"), url("/missing.wav")],
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["added"] == [url("/a.wav")]
+    # Already in the session, repeated in the request, and the same content under another URL.
+    assert body["skipped"] == [url("/b.wav"), url("/a.wav"), url("/a-copy.wav")]
+    assert {failure["url"] for failure in body["failed"]} == {url("/page.html"), url("/large.wav"),
+                                                              url("/missing.wav")}
+    clips = await store.list_clips("s1")
+    assert [clip.sha256 for clip in clips] == [hashlib.sha256(make_wav(tone=2)).hexdigest(),
+                                               hashlib.sha256(make_wav(tone=1)).hexdigest()]
+    assert not [name for name in os.listdir(store.working_dir("s1")) if name.endswith((".incoming", ".part"))]
+
+
+async def test_add_audio_url_surfaces_download_errors(server, api):
+    client, store = api
+
+    too_large = await client.post("/add-audio-url-to-session/",
+                                  data={"session_id": "s1", "audio_url": str(server.make_url("/large.wav"))})
+    not_audio = await client.post("/add-audio-url-to-session/",
+                                  data={"session_id": "s1", "audio_url": str(server.make_url("/page.html"))})
+
+    assert too_large.status_code == 413
+    assert not_audio.status_code == 400
+    assert await store.list_clips("s1") == []
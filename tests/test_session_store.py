@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+
+from app.services.session_store import (
+    DuplicateClipError,
+    DuplicateSourceError,
+    GridFSHandles,
+    GridFSSessionStore,
+    LocalSessionStore,
+    SharedDirSessionStore,
+)
+from tests.fake_mongo import FakeCollection, FakeFilesCollection, FakeGridFSBucket
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeMongo:
+    """One fake database shared by every node's GridFSSessionStore."""
+
+    def __init__(self):
+        self.sessions = FakeCollection()
+        self.bucket = FakeGridFSBucket()
+        self.files = FakeFilesCollection(self.bucket)
+
+    def node(self, cache_dir: str) -> GridFSSessionStore:
+        handles = GridFSHandles(self.sessions, self.files, self.bucket)
+        return GridFSSessionStore(str(cache_dir), lambda: handles)
+
+
+@pytest.fixture(params=["local", "shared", "gridfs"])
+def store(request, tmp_path):
+    if request.param == "local":
+        return LocalSessionStore(str(tmp_path / "sessions"))
+    if request.param == "shared":
+        return SharedDirSessionStore(str(tmp_path / "shared"), lock_timeout=5.0, poll_interval=0.001)
+    return FakeMongo().node(tmp_path / "node-a")
+
+
+async def stage(store, session_id: str, data: bytes) -> str:
+    staged_path = await store.staging_path(session_id)
+    with open(staged_path, "wb") as f:
+        f.write(data)
+    return staged_path
+
+
+async def add(store, session_id: str, data: bytes, source_url: str | None = None, filename: str = "clip.mp3",
+              staged_path: str | None = None):
+    staged_path = staged_path or await stage(store, session_id, data)
+    return await store.add_clip(session_id, staged_path, filename, "audio/mpeg", hashlib.sha256(data).hexdigest(),
+                                source_url, duration=1.5, sample_rate=44100)
+
+
+def read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def test_clips_are_listed_in_the_order_they_were_added(store):
+    clips = [b"first", b"second", b"third"]
+    for i, data in enumerate(clips):
+        entry = await add(store, "session", data, filename=f"clip{i}.wav")
+        assert entry.seq == i
+        assert entry.filename.endswith(".wav")
+
+    listed = await store.list_clips("session")
+
+    assert [entry.seq for entry in listed] == [0, 1, 2]
+    assert [read(entry.path) for entry in listed] == clips
+    assert listed[0].mime_type == "audio/mpeg"
+    assert listed[0].sha256 == hashlib.sha256(b"first").hexdigest()
+    assert (listed[0].duration, listed[0].sample_rate) == (1.5, 44100)
+
+
+async def test_repeated_source_url_is_rejected_and_staged_file_removed(store):
+    await add(store, "session", b"one", source_url="https://example.com/a.mp3")
+
+    staged_path = await stage(store, "session", b"two")
+
+    with pytest.raises(DuplicateSourceError) as raised:
+        await add(store, "session", b"two", source_url="https://example.com/a.mp3", staged_path=staged_path)
+
+    assert not isinstance(raised.value, DuplicateClipError)
+    assert not os.path.exists(staged_path)
+    assert await store.source_urls("session") == ["https://example.com/a.mp3"]
+    assert len(await store.list_clips("session")) == 1
+
+
+async def test_same_content_is_rejected_from_a_different_url(store):
+    await add(store, "session", b"same audio", source_url="https://example.com/a.mp3")
+    staged_path = await stage(store, "session", b"same audio")
+
+    with pytest.raises(DuplicateClipError):
+        await add(store, "session", b"same audio", source_url="https://example.com/b.mp3", staged_path=staged_path)
+
+    assert not os.path.exists(staged_path)
+    assert await store.source_urls("session") == ["https://example.com/a.mp3"]
+    assert len(await store.list_clips("session")) == 1
+
+
+async def test_same_content_is_allowed_in_another_session(store):
+    await add(store, "one", b"same audio")
+    await add(store, "two", b"same audio")
+
+    assert len(await store.list_clips("one")) == len(await store.list_clips("two")) == 1
+
+
+async def test_concurrent_first_adds_of_different_clips_all_succeed(store):
+    clips = [f"clip {i}".encode() for i in range(6)]
+
+    entries = await asyncio.gather(*(add(store, "new-session", data) for data in clips))
+
+    assert sorted(entry.seq for entry in entries) == list(range(len(clips)))
+    listed = await store.list_clips("new-session")
+    assert sorted(read(entry.path) for entry in listed) == sorted(clips)
+
+
+async def test_concurrent_adds_of_the_same_clip_keep_one(store):
+    results = await asyncio.gather(*(add(store, "session", b"same audio") for _ in range(4)),
+                                   return_exceptions=True)
+
+    assert sum(not isinstance(result, Exception) for result in results) == 1
+    assert all(isinstance(result, DuplicateClipError) for result in results if isinstance(result, Exception))
+    assert len(await store.list_clips("session")) == 1
+
+
+async def test_delete_removes_the_session(store):
+    await add(store, "session", b"audio", source_url="https://example.com/a.mp3")
+
+    await store.delete("session")
+
+    assert await store.list_clips("session") == []
+    assert await store.source_urls("session") == []
+    assert not os.path.exists(store.working_dir("session"))
+
+
+async def test_usage_reports_stored_sessions(store):
+    await add(store, "one", b"12345")
+    await add(store, "two", b"123")
+
+    usage = {session.session_id: session for session in await store.usage()}
+
+    assert set(usage) == {"one", "two"}
+    assert usage["one"].size >= 5
+
+
+async def test_gridfs_list_clips_downloads_clips_added_on_another_node(tmp_path):
+    mongo = FakeMongo()
+    node_a, node_b = mongo.node(tmp_path / "node-a"), mongo.node(tmp_path / "node-b")
+    await add(node_a, "session", b"from a")
+    await add(node_b, "session", b"from b")
+    await add(node_a, "session", b"from a again")
+
+    listed = await node_b.list_clips("session")
+
+    assert [read(entry.path) for entry in listed] == [b"from a", b"from b", b"from a again"]
+    assert all(entry.path.startswith(str(tmp_path / "node-b")) for entry in listed)
+    assert mongo.bucket.downloads == 2
+
+    await node_b.list_clips("session")
+    assert mongo.bucket.downloads == 2
+
+
+async def test_gridfs_duplicates_are_detected_across_nodes(tmp_path):
+    mongo = FakeMongo()
+    node_a, node_b = mongo.node(tmp_path / "node-a"), mongo.node(tmp_path / "node-b")
+    await add(node_a, "session", b"audio", source_url="https://example.com/a.mp3")
+
+    with pytest.raises(DuplicateSourceError):
+        await add(node_b, "session", b"other audio", source_url="https://example.com/a.mp3")
+    with pytest.raises(DuplicateClipError):
+        await add(node_b, "session", b"audio")
+    assert os.listdir(node_b.working_dir("session")) == []
+    assert len(await node_b.list_clips("session")) == 1
+
+
+async def test_gridfs_concurrent_session_creation_from_two_nodes(tmp_path):
+    mongo = FakeMongo()
+    node_a, node_b = mongo.node(tmp_path / "node-a"), mongo.node(tmp_path / "node-b")
+
+    entry_a, entry_b = await asyncio.gather(add(node_a, "session", b"a"), add(node_b, "session", b"b"))
+
+    assert {entry_a.seq, entry_b.seq} == {0, 1}
+    assert len(await node_a.list_clips("session")) == 2